@@ -0,0 +1,28 @@
+"""Headless chess engine: rules, evaluation and search with no pygame dependency.
+
+The pygame game in main.py is one client; worker processes, benchmarks and
+batch jobs import this package directly.
+"""
+
+from .bitboard import BOARD_SIZE, COLORS, PIECE_CODES, PIECE_TUPLES
+from .evaluation import evaluate_board
+from .position import (
+    START_FEN, Position, encode_move, move_from_uci, move_to_positions, move_to_uci, parse_square,
+    square_name
+)
+from .rules import (
+    GameStatus, create_board, get_game_status, get_raw_moves, get_valid_moves, is_checkmate,
+    is_in_check, is_stalemate
+)
+from .perft import divide, perft, validate_perft
+from .search import (
+    MATE_SCORE, SearchInfo, SearchWorker, Searcher, TranspositionTable, choose_easy_ai_move,
+    default_transposition_table, make_ai_move, make_easy_ai_move, minimax, search_best_move
+)
+from .parallel import SEARCH_WORKERS, ParallelSearcher, SearchProcess
+from .book import OpeningBook, build_book
+from .polyglot import polyglot_key
+from .tablebase import Tablebases, build_tables, tablebases
+from .uci import UciEngine
+from .tournament import PlayerConfig, elo_estimate, parse_player, play_game, run_match, sprt_llr
+from .analysis import analyse_stream, parse_epd, read_positions
@@ -0,0 +1,59 @@
+"""Command line tools that need no display.
+
+    python -m engine bench [workers]             time the parallel search against the serial one
+    python -m engine bench-pruning [depth]       compare the selective search settings
+    python -m engine perft <depth> [fen]         print a perft divide with nodes per second
+    python -m engine perft-suite [depth]         check move generation against the standard suite
+    python -m engine uci                         speak the Universal Chess Interface on stdin/stdout
+    python -m engine book build <book> <pgn>...  build an opening book from PGN files
+    python -m engine book probe <book> [fen]     list the book moves for a position
+    python -m engine tablebase build [dir]       generate the KQK, KRK and KPK endgame tables
+    python -m engine match [options]             play two engine settings against each other (--help)
+    python -m engine analyse [file] [options]    search FEN/EPD lines, writing JSONL records (--help)
+"""
+
+import sys
+
+from .analysis import main as analyse_main
+from .bench import benchmark_parallel_search, benchmark_selective_search
+from .book import OpeningBook, build_book
+from .parallel import SEARCH_WORKERS
+from .perft import divide, validate_perft
+from .position import START_FEN, Position, move_to_uci
+from .tablebase import TABLEBASE_DIR, build_tables
+from .tournament import main as match_main
+from .uci import UciEngine
+
+def main(argv):
+    command = argv[0] if argv else None
+    if command == 'bench':
+        benchmark_parallel_search(workers=int(argv[1]) if len(argv) > 1 else SEARCH_WORKERS)
+    elif command == 'bench-pruning':
+        benchmark_selective_search(int(argv[1]) if len(argv) > 1 else 6)
+    elif command == 'perft':
+        divide(Position.from_fen(' '.join(argv[2:]) or START_FEN), int(argv[1]) if len(argv) > 1 else 4)
+    elif command == 'perft-suite':
+        return 0 if validate_perft(int(argv[1]) if len(argv) > 1 else 3) else 1
+    elif command == 'uci':
+        return UciEngine().run()
+    elif command == 'book' and argv[1:2] == ['build'] and len(argv) > 3:
+        print(f"{build_book(argv[3:], argv[2])} entries written to {argv[2]}")
+    elif command == 'book' and argv[1:2] == ['probe'] and len(argv) > 2:
+        board = Position.from_fen(' '.join(argv[3:]) or START_FEN)
+        with OpeningBook(argv[2]) as book:
+            for move, weight in book.moves(board):
+                print(f"{move_to_uci(move)} {weight}")
+    elif command == 'tablebase' and argv[1:2] == ['build']:
+        for name, (decided, longest) in build_tables(argv[2] if len(argv) > 2 else TABLEBASE_DIR).items():
+            print(f"{name}: {decided} decided positions, longest mate {longest} plies")
+    elif command == 'match':
+        return match_main(argv[1:])
+    elif command == 'analyse':
+        return analyse_main(argv[1:])
+    else:
+        print(__doc__)
+        return 2
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,138 @@
+"""Offline analysis of position files: FEN or EPD lines in, one JSON record per position out.
+
+Lines are read lazily and handed to a process pool with a bounded number
+in flight, and records are written as soon as each search finishes, so
+memory stays flat however long the input is. Records therefore come out
+in completion order; each carries its input line number.
+
+    python -m engine analyse positions.epd --depth 8 --workers 4 > results.jsonl
+"""
+
+import argparse
+import json
+import multiprocessing
+import queue
+import sys
+import time
+
+from .parallel import SEARCH_WORKERS
+from .pgn import parse_san
+from .position import Position, move_to_uci
+from .search import MAX_SEARCH_DEPTH, Searcher, TranspositionTable
+from .uci import format_score
+
+ANALYSIS_HASH_MB = 16  # Per worker process
+IN_FLIGHT_PER_WORKER = 4  # Positions queued ahead of each worker so none of them idles
+
+_worker_searcher = None
+
+def _init_analysis_worker():
+    global _worker_searcher
+    _worker_searcher = Searcher(TranspositionTable(ANALYSIS_HASH_MB))
+
+def read_positions(stream):
+    """Yield (line number, text) for every line holding a position, skipping blanks and # comments"""
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield number, line
+
+def parse_epd(text):
+    """(fen, operations) from a FEN or EPD line; operations maps opcodes like bm and id to operand lists"""
+    fields = text.split(None, 4)
+    rest = fields[4] if len(fields) > 4 else ''
+    clocks = rest.split()[:2]
+    if len(clocks) == 2 and all(clock.isdigit() for clock in clocks):
+        return text, {}  # A full FEN with move counters
+    operations = {}
+    for operation in rest.split(';'):
+        opcode, *operands = operation.split() or ['']
+        if opcode:
+            operations[opcode] = [operand.strip('"') for operand in operands]
+    return ' '.join(fields[:4]), operations
+
+def analyse_position(task):
+    """Pool task: search one input line and return its JSON-ready record"""
+    number, text, time_limit, depth, nodes = task
+    record = {'line': number}
+    try:
+        fen, operations = parse_epd(text)
+        board = Position.from_fen(fen)
+    except (ValueError, IndexError, KeyError):
+        record.update(input=text, error='unreadable position')
+        return record
+    record['fen'] = fen
+    if 'id' in operations:
+        record['id'] = ' '.join(operations['id'])
+    searcher = _worker_searcher
+    start = time.perf_counter()
+    white_score, _, reached = searcher.iterative_deepening(board, time_limit, depth, max_nodes=nodes)
+    pv = searcher.principal_variation
+    if pv:
+        score = format_score(white_score if board.side_to_move == 0 else -white_score)
+    else:
+        score = 'mate 0' if board.is_in_check(board.side_to_move) else 'cp 0'
+    record.update(bestmove=move_to_uci(pv[0]) if pv else None, score=score, depth=reached,
+                  nodes=searcher.nodes, time=round(time.perf_counter() - start, 4),
+                  pv=[move_to_uci(move) for move in pv])
+    # EPD test suites name the expected (bm) or refuted (am) moves in SAN
+    for opcode in ('bm', 'am'):
+        if opcode in operations and pv:
+            moves = {parse_san(board, san) for san in operations[opcode]}
+            record['solved'] = (pv[0] in moves) == (opcode == 'bm')
+    return record
+
+def analyse_stream(lines, time_limit=float('inf'), depth=MAX_SEARCH_DEPTH, nodes=None, workers=SEARCH_WORKERS,
+                   in_flight=None):
+    """Yield a record for each position line in `lines`, as each finishes.
+
+    At most in_flight positions are read ahead of the results, which bounds
+    memory use for inputs of any length.
+    """
+    in_flight = in_flight or workers * IN_FLIGHT_PER_WORKER
+    done = queue.Queue()
+    pending = 0
+    with multiprocessing.get_context().Pool(workers, initializer=_init_analysis_worker) as pool:
+        for number, text in read_positions(lines):
+            if pending == in_flight:
+                yield done.get()
+                pending -= 1
+            pool.apply_async(analyse_position, ((number, text, time_limit, depth, nodes),),
+                             callback=done.put, error_callback=lambda error, number=number: done.put(
+                                 {'line': number, 'error': repr(error)}))
+            pending += 1
+        for _ in range(pending):
+            yield done.get()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m engine analyse', description=__doc__.split('\n')[0])
+    parser.add_argument('input', nargs='?', default='-', help='FEN or EPD file, or - for stdin')
+    parser.add_argument('--output', default='-', help='JSONL file to write, or - for stdout')
+    parser.add_argument('--depth', type=int)
+    parser.add_argument('--movetime', type=float, help='seconds per position')
+    parser.add_argument('--nodes', type=int)
+    parser.add_argument('--workers', type=int, default=SEARCH_WORKERS)
+    parser.add_argument('--in-flight', type=int, help='positions queued at once (default 4 per worker)')
+    args = parser.parse_args(argv)
+    if args.movetime is None and args.nodes is None and args.depth is None:
+        parser.error('give at least one of --depth, --movetime or --nodes')
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    target = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    start = time.perf_counter()
+    count = total_nodes = 0
+    try:
+        time_limit = float('inf') if args.movetime is None else args.movetime
+        for record in analyse_stream(source, time_limit, args.depth or MAX_SEARCH_DEPTH, args.nodes,
+                                     args.workers, args.in_flight):
+            target.write(json.dumps(record) + '\n')
+            target.flush()
+            count += 1
+            total_nodes += record.get('nodes', 0)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    elapsed = time.perf_counter() - start
+    print(f"{count} positions in {elapsed:.1f}s, {total_nodes / max(elapsed, 1e-9):,.0f} nodes/s", file=sys.stderr)
+    return 0
@@ -0,0 +1,57 @@
+"""Benchmarks comparing search configurations by time to depth"""
+
+import time
+
+from .position import move_from_uci
+from .rules import create_board
+from .search import Searcher, default_transposition_table
+from .parallel import ParallelSearcher, SEARCH_WORKERS
+
+BENCHMARK_DEPTH = 4  # The depth "hard" used to search at before time budgets
+BENCHMARK_LINES = [
+    "",
+    "e2e4 e7e5 g1f3 b8c6 f1c4 g8f6",
+    "d2d4 d7d5 c2c4 e7e6 b1c3 g8f6 c1g5 f8e7",
+]
+
+def benchmark_parallel_search(depth=BENCHMARK_DEPTH, workers=SEARCH_WORKERS):
+    """Print time-to-depth for the serial search against ParallelSearcher on a few positions"""
+    print(f"Time to depth {depth}, {workers} worker processes")
+    for line in BENCHMARK_LINES:
+        board = create_board()
+        for text in line.split():
+            board.make_move(move_from_uci(text))
+        timings = []
+        for searcher_class in (Searcher, ParallelSearcher):
+            default_transposition_table().clear()
+            searcher = Searcher() if searcher_class is Searcher else ParallelSearcher(workers)
+            start = time.perf_counter()
+            searcher.iterative_deepening(board, float('inf'), max_depth=depth)
+            timings.append(time.perf_counter() - start)
+            if searcher_class is Searcher:
+                cutoff_rate = searcher.first_move_cutoff_rate
+            else:
+                searcher.close()
+        serial, parallel = timings
+        print(f"{line or 'start position':<45} serial {serial:6.2f}s  parallel {parallel:6.2f}s  "
+              f"speedup {serial / parallel:4.2f}x  first-move cutoffs {cutoff_rate:.0%}")
+
+def benchmark_selective_search(depth=6):
+    """Print time-to-depth with null-move pruning and late move reductions switched on and off"""
+    print(f"Time to depth {depth}")
+    settings = [(False, False), (True, False), (False, True), (True, True)]
+    for line in BENCHMARK_LINES:
+        board = create_board()
+        for text in line.split():
+            board.make_move(move_from_uci(text))
+        print(line or 'start position')
+        for null_move, late_move_reductions in settings:
+            default_transposition_table().clear()
+            searcher = Searcher()
+            searcher.null_move = null_move
+            searcher.late_move_reductions = late_move_reductions
+            start = time.perf_counter()
+            score, best_move, _ = searcher.iterative_deepening(board, float('inf'), max_depth=depth)
+            elapsed = time.perf_counter() - start
+            print(f"  null move {'on ' if null_move else 'off'}  LMR {'on ' if late_move_reductions else 'off'}  "
+                  f"{elapsed:6.2f}s  {searcher.nodes:8d} nodes  score {score:+d}")
@@ -0,0 +1,104 @@
+"""Board geometry: piece codes, precomputed attack tables and castling constants.
+
+Squares are numbered row * 8 + col, so bit 0 is board[0][0] (a1) and bit 63 is board[7][7] (h8).
+"""
+
+BOARD_SIZE = 8
+COLORS = ('white', 'black')
+PIECE_TYPES = ('pawn', 'knight', 'bishop', 'rook', 'queen', 'king')
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+EMPTY = -1
+FULL_BOARD = (1 << 64) - 1
+
+# Piece codes are color * 6 + piece type; index EMPTY (-1) picks up the trailing empty square
+PIECE_TUPLES = [(color, piece_type) for color in COLORS for piece_type in PIECE_TYPES] + ['']
+PIECE_CODES = {piece: code for code, piece in enumerate(PIECE_TUPLES[:-1])}
+PIECE_COLOR = [code // 6 for code in range(12)]
+PIECE_KIND = [code % 6 for code in range(12)]
+
+def squares_of(bitboard):
+    """Square numbers of every set bit, lowest first"""
+    squares = []
+    while bitboard:
+        lsb = bitboard & -bitboard
+        squares.append(lsb.bit_length() - 1)
+        bitboard ^= lsb
+    return squares
+
+def _leaper_table(offsets):
+    """Attack masks for a piece that jumps by fixed (row, col) offsets"""
+    table = []
+    for sq in range(64):
+        row, col = divmod(sq, BOARD_SIZE)
+        mask = 0
+        for drow, dcol in offsets:
+            new_row, new_col = row + drow, col + dcol
+            if 0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE:
+                mask |= 1 << (new_row * BOARD_SIZE + new_col)
+        table.append(mask)
+    return table
+
+KNIGHT_ATTACKS = _leaper_table([(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)])
+KING_ATTACKS = _leaper_table([(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)])
+# Squares a pawn of each color attacks (white moves towards row 7, black towards row 0)
+PAWN_ATTACKS = [_leaper_table([(1, -1), (1, 1)]), _leaper_table([(-1, -1), (-1, 1)])]
+
+# Directions 0-3 step towards higher square numbers, 4-7 towards lower ones
+RAY_DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1), (0, -1), (-1, 0), (-1, -1), (-1, 1)]
+RAYS = [_leaper_table([(drow * step, dcol * step) for step in range(1, BOARD_SIZE)])
+        for drow, dcol in RAY_DIRECTIONS]
+ROOK_RAYS = ((RAYS[0], True), (RAYS[1], True), (RAYS[4], False), (RAYS[5], False))
+BISHOP_RAYS = ((RAYS[2], True), (RAYS[3], True), (RAYS[6], False), (RAYS[7], False))
+# Every square a rook or bishop could reach from each square on an empty board
+ROOK_LINES = [RAYS[0][sq] | RAYS[1][sq] | RAYS[4][sq] | RAYS[5][sq] for sq in range(64)]
+BISHOP_LINES = [RAYS[2][sq] | RAYS[3][sq] | RAYS[6][sq] | RAYS[7][sq] for sq in range(64)]
+
+def _between_table():
+    """BETWEEN[a][b]: squares strictly between a and b when they share a line, else 0"""
+    table = [[0] * 64 for _ in range(64)]
+    for rays in RAYS:
+        for sq in range(64):
+            for target in squares_of(rays[sq]):
+                table[sq][target] = rays[sq] & ~rays[target] & ~(1 << target)
+    return table
+
+BETWEEN = _between_table()
+
+def slider_attacks(sq, occupied, rays):
+    """Squares a sliding piece on sq attacks along the given rays, stopping at the first blocker"""
+    attacks = 0
+    for ray_table, positive in rays:
+        ray = ray_table[sq]
+        blockers = ray & occupied
+        if blockers:
+            # The nearest blocker is the lowest bit on rising rays and the highest on falling ones
+            if positive:
+                ray ^= ray_table[(blockers & -blockers).bit_length() - 1]
+            else:
+                ray ^= ray_table[blockers.bit_length() - 1]
+        attacks |= ray
+    return attacks
+
+def rook_attacks(sq, occupied):
+    return slider_attacks(sq, occupied, ROOK_RAYS)
+
+def bishop_attacks(sq, occupied):
+    return slider_attacks(sq, occupied, BISHOP_RAYS)
+
+def queen_attacks(sq, occupied):
+    return slider_attacks(sq, occupied, ROOK_RAYS) | slider_attacks(sq, occupied, BISHOP_RAYS)
+
+# Castling rights are a 4-bit mask; CASTLING_MASKS clears the rights a move touching a square forfeits
+WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE = 1, 2, 4, 8
+CASTLING_MASKS = [15] * 64
+for _sq, _rights in ((0, WHITE_QUEENSIDE), (4, WHITE_KINGSIDE | WHITE_QUEENSIDE), (7, WHITE_KINGSIDE),
+                     (56, BLACK_QUEENSIDE), (60, BLACK_KINGSIDE | BLACK_QUEENSIDE), (63, BLACK_KINGSIDE)):
+    CASTLING_MASKS[_sq] = 15 ^ _rights
+# Per color: (right, king from, king to, rook from, rook to, squares that must be empty, squares the king crosses)
+CASTLING_MOVES = [
+    [(WHITE_KINGSIDE, 4, 6, 7, 5, 0x60, (5, 6)), (WHITE_QUEENSIDE, 4, 2, 0, 3, 0x0E, (3, 2))],
+    [(BLACK_KINGSIDE, 60, 62, 63, 61, 0x60 << 56, (61, 62)),
+     (BLACK_QUEENSIDE, 60, 58, 56, 59, 0x0E << 56, (59, 58))],
+]
+PROMOTION_RANKS = 0xFF | (0xFF << 56)
+PROMOTION_KINDS = (QUEEN, ROOK, BISHOP, KNIGHT)
@@ -0,0 +1,141 @@
+"""Opening book in the Polyglot file layout, read through mmap with a binary search.
+
+Each entry is 16 big-endian bytes: position key (u64), move (u16), weight
+(u16) and learn (u32), sorted by key. Moves use Polyglot's encoding (to file
+in bits 0-2, to rank 3-5, from file 6-8, from rank 9-11, promotion piece
+12-14, castling written as the king taking its own rook). Keys are
+Polyglot's own position hashes, so books built by other tools work here and
+books built here work in other programs.
+"""
+
+import mmap
+import random
+import struct
+from collections import defaultdict
+
+from .bitboard import EMPTY, KING, PIECE_COLOR, PIECE_KIND, ROOK
+from .pgn import game_positions, read_games
+from .polyglot import polyglot_key
+
+BOOK_ENTRY = struct.Struct('>QHHI')
+BOOK_KEY = struct.Struct('>Q')
+BOOK_MAX_PLY = 24  # Book moves are only collected from the first plies of each game
+BOOK_MIN_GAMES = 2  # Moves seen fewer times than this are left out of built books
+MAX_BOOK_WEIGHT = 0xFFFF
+
+def move_to_book(move, board):
+    """Polyglot move code for a packed move played on board"""
+    from_sq = move & 63
+    to_sq = move >> 6 & 63
+    if PIECE_KIND[board.squares[from_sq]] == KING and abs(to_sq - from_sq) == 2:
+        to_sq = from_sq + 3 if to_sq > from_sq else from_sq - 4  # The rook's corner
+    return (to_sq & 7) | (to_sq >> 3) << 3 | (from_sq & 7) << 6 | (from_sq >> 3) << 9 | (move >> 12) << 12
+
+def move_from_book(code, board, legal_moves=None):
+    """Packed move for a Polyglot move code on board, or None if it isn't legal there"""
+    from_sq = (code >> 9 & 7) * 8 + (code >> 6 & 7)
+    to_sq = (code >> 3 & 7) * 8 + (code & 7)
+    piece = board.squares[from_sq]
+    if piece == EMPTY:
+        return None
+    if PIECE_KIND[piece] == KING and board.squares[to_sq] == PIECE_COLOR[piece] * 6 + ROOK:
+        to_sq = from_sq + 2 if to_sq > from_sq else from_sq - 2  # King onto its own rook: castling
+    move = from_sq | (to_sq << 6) | (code >> 12 & 7) << 12
+    if legal_moves is None:
+        legal_moves = board.legal_moves(board.side_to_move)
+    return move if move in legal_moves else None
+
+class OpeningBook:
+    """Read-only view of a book file; lookups touch only the pages the binary search visits"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.size = 0
+        self.data = None
+        size = self.file.seek(0, 2)
+        if size >= BOOK_ENTRY.size:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.size = size // BOOK_ENTRY.size
+
+    def __len__(self):
+        return self.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+        self.file.close()
+
+    def entries(self, key):
+        """(polyglot move, weight, learn) for every entry stored under key, in file order"""
+        data = self.data
+        low, high = 0, self.size
+        # Lower bound: the first entry whose key is not below the one we want
+        while low < high:
+            middle = (low + high) // 2
+            if BOOK_KEY.unpack_from(data, middle * BOOK_ENTRY.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        found = []
+        while low < self.size:
+            entry_key, code, weight, learn = BOOK_ENTRY.unpack_from(data, low * BOOK_ENTRY.size)
+            if entry_key != key:
+                break
+            found.append((code, weight, learn))
+            low += 1
+        return found
+
+    def moves(self, board):
+        """(packed move, weight) for each legal book move in board's position"""
+        moves = []
+        entries = self.entries(polyglot_key(board))
+        legal_moves = board.legal_moves(board.side_to_move) if entries else None
+        for code, weight, _ in entries:
+            move = move_from_book(code, board, legal_moves)
+            if move is not None and weight:
+                moves.append((move, weight))
+        return moves
+
+    def choose_move(self, board, rng=random):
+        """A book move picked at random in proportion to its weight, or None when out of book"""
+        moves = self.moves(board)
+        if not moves:
+            return None
+        return rng.choices([move for move, _ in moves], [weight for _, weight in moves])[0]
+
+def build_book(pgn_paths, book_path, max_ply=BOOK_MAX_PLY, min_games=BOOK_MIN_GAMES):
+    """Write a book from PGN files and return how many entries it holds.
+
+    A move scores 2 for each game its side went on to win and 1 for each
+    draw; moves played fewer than min_games times, or that never scored, are
+    dropped, and weights are scaled down to fit 16 bits.
+    """
+    scores = defaultdict(int)
+    counts = defaultdict(int)
+    for path in pgn_paths:
+        with open(path, encoding='utf-8', errors='replace') as stream:
+            for headers, san_moves, result in read_games(stream):
+                for board, move in game_positions(headers, san_moves[:max_ply]):
+                    entry = (polyglot_key(board), move_to_book(move, board))
+                    counts[entry] += 1
+                    if result == '1/2-1/2':
+                        scores[entry] += 1
+                    elif result == ('1-0' if board.side_to_move == 0 else '0-1'):
+                        scores[entry] += 2
+    entries = [(key, code, scores[key, code]) for (key, code), count in counts.items()
+               if count >= min_games and scores[key, code]]
+    top = max((weight for _, _, weight in entries), default=0)
+    scale = MAX_BOOK_WEIGHT / top if top > MAX_BOOK_WEIGHT else 1
+    entries.sort(key=lambda entry: (entry[0], -entry[2]))
+    with open(book_path, 'wb') as book:
+        for key, code, weight in entries:
+            book.write(BOOK_ENTRY.pack(key, code, max(1, int(weight * scale)), 0))
+    return len(entries)
@@ -0,0 +1,134 @@
+"""Material values, piece-square tables and the game-phase weights that taper between them"""
+
+from .bitboard import BOARD_SIZE, PIECE_COLOR, PIECE_TUPLES, PIECE_TYPES
+
+# Piece values for evaluation
+PIECE_VALUES = {
+    'pawn': 100,
+    'knight': 320,
+    'bishop': 330,
+    'rook': 500,
+    'queen': 900,
+    'king': 20000
+}
+ 
+# Piece-square tables from white's side, written with rank 8 on the first line
+PAWN_TABLE = [
+     0,   0,   0,   0,   0,   0,   0,   0,
+    50,  50,  50,  50,  50,  50,  50,  50,
+    10,  10,  20,  30,  30,  20,  10,  10,
+     5,   5,  10,  25,  25,  10,   5,   5,
+     0,   0,   0,  20,  20,   0,   0,   0,
+     5,  -5, -10,   0,   0, -10,  -5,   5,
+     5,  10,  10, -20, -20,  10,  10,   5,
+     0,   0,   0,   0,   0,   0,   0,   0,
+]
+PAWN_ENDGAME_TABLE = [
+     0,   0,   0,   0,   0,   0,   0,   0,
+    90,  90,  90,  90,  90,  90,  90,  90,
+    60,  60,  60,  60,  60,  60,  60,  60,
+    35,  35,  35,  35,  35,  35,  35,  35,
+    20,  20,  20,  20,  20,  20,  20,  20,
+    10,  10,  10,  10,  10,  10,  10,  10,
+     5,   5,   5,   5,   5,   5,   5,   5,
+     0,   0,   0,   0,   0,   0,   0,   0,
+]
+KNIGHT_TABLE = [
+   -50, -40, -30, -30, -30, -30, -40, -50,
+   -40, -20,   0,   0,   0,   0, -20, -40,
+   -30,   0,  10,  15,  15,  10,   0, -30,
+   -30,   5,  15,  20,  20,  15,   5, -30,
+   -30,   0,  15,  20,  20,  15,   0, -30,
+   -30,   5,  10,  15,  15,  10,   5, -30,
+   -40, -20,   0,   5,   5,   0, -20, -40,
+   -50, -40, -30, -30, -30, -30, -40, -50,
+]
+BISHOP_TABLE = [
+   -20, -10, -10, -10, -10, -10, -10, -20,
+   -10,   0,   0,   0,   0,   0,   0, -10,
+   -10,   0,   5,  10,  10,   5,   0, -10,
+   -10,   5,   5,  10,  10,   5,   5, -10,
+   -10,   0,  10,  10,  10,  10,   0, -10,
+   -10,  10,  10,  10,  10,  10,  10, -10,
+   -10,   5,   0,   0,   0,   0,   5, -10,
+   -20, -10, -10, -10, -10, -10, -10, -20,
+]
+ROOK_TABLE = [
+     0,   0,   0,   0,   0,   0,   0,   0,
+     5,  10,  10,  10,  10,  10,  10,   5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+     0,   0,   0,   5,   5,   0,   0,   0,
+]
+QUEEN_TABLE = [
+   -20, -10, -10,  -5,  -5, -10, -10, -20,
+   -10,   0,   0,   0,   0,   0,   0, -10,
+   -10,   0,   5,   5,   5,   5,   0, -10,
+    -5,   0,   5,   5,   5,   5,   0,  -5,
+     0,   0,   5,   5,   5,   5,   0,  -5,
+   -10,   5,   5,   5,   5,   5,   0, -10,
+   -10,   0,   5,   0,   0,   0,   0, -10,
+   -20, -10, -10,  -5,  -5, -10, -10, -20,
+]
+KING_TABLE = [
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -20, -30, -30, -40, -40, -30, -30, -20,
+   -10, -20, -20, -20, -20, -20, -20, -10,
+    20,  20,   0,   0,   0,   0,  20,  20,
+    20,  30,  10,   0,   0,  10,  30,  20,
+]
+KING_ENDGAME_TABLE = [
+   -50, -40, -30, -20, -20, -30, -40, -50,
+   -30, -20, -10,   0,   0, -10, -20, -30,
+   -30, -10,  20,  30,  30,  20, -10, -30,
+   -30, -10,  30,  40,  40,  30, -10, -30,
+   -30, -10,  30,  40,  40,  30, -10, -30,
+   -30, -10,  20,  30,  30,  20, -10, -30,
+   -30, -30,   0,   0,   0,   0, -30, -30,
+   -50, -30, -30, -30, -30, -30, -30, -50,
+]
+MIDDLEGAME_TABLES = {
+    'pawn': PAWN_TABLE,
+    'knight': KNIGHT_TABLE,
+    'bishop': BISHOP_TABLE,
+    'rook': ROOK_TABLE,
+    'queen': QUEEN_TABLE,
+    'king': KING_TABLE
+}
+ENDGAME_TABLES = dict(MIDDLEGAME_TABLES, pawn=PAWN_ENDGAME_TABLE, king=KING_ENDGAME_TABLE)
+ 
+# Game phase weights: 24 with all minor and major pieces on the board, 0 with pawns and kings only
+PHASE_WEIGHTS = {
+    'pawn': 0,
+    'knight': 1,
+    'bishop': 1,
+    'rook': 2,
+    'queen': 4,
+    'king': 0
+}
+MAX_PHASE = 24
+
+PIECE_VALUE_LIST = [PIECE_VALUES[piece_type] for piece_type in PIECE_TYPES]
+PIECE_PHASE = [PHASE_WEIGHTS[piece_type] for piece_type in PIECE_TYPES] * 2
+
+def _piece_square_scores(tables, code):
+    """Material plus table bonus for piece `code` on each square, signed from white's view"""
+    piece_type = PIECE_TUPLES[code][1]
+    value = PIECE_VALUES[piece_type] if piece_type != 'king' else 0  # Both kings are always present
+    table = tables[piece_type]
+    if PIECE_COLOR[code] == 0:
+        # Tables list rank 8 first, while square 0 is white's a1
+        return [value + table[(7 - sq // BOARD_SIZE) * BOARD_SIZE + sq % BOARD_SIZE] for sq in range(64)]
+    return [-(value + table[sq]) for sq in range(64)]
+
+PST_MIDDLEGAME = [_piece_square_scores(MIDDLEGAME_TABLES, code) for code in range(12)]
+PST_ENDGAME = [_piece_square_scores(ENDGAME_TABLES, code) for code in range(12)]
+
+def evaluate_board(board):
+    return board.evaluate()
@@ -0,0 +1,210 @@
+"""Root-splitting parallel search over a process pool, and searches run in a process of their own"""
+
+import multiprocessing
+import os
+import queue
+
+from .bitboard import EMPTY
+from .search import (EXACT, INFINITY, LMR_MIN_DEPTH, LMR_MIN_MOVES, LOWER_BOUND, SearchAborted, Searcher,
+                     TranspositionTable, UPPER_BOUND, score_to_tt)
+
+# Parallel search settings
+SEARCH_WORKERS = max(1, (os.cpu_count() or 1) - 1)  # Processes used by ParallelSearcher
+PARALLEL_MIN_DEPTH = 3  # Shallower iterations finish faster than the pool round trip
+SEARCH_PROCESS_EXIT_TIMEOUT = 5.0  # Seconds SearchProcess.close waits before terminating the process
+SEARCH_PROCESS_POLL_INTERVAL = 0.1  # Seconds SearchProcess.cancel waits for a message before checking the process
+
+_worker_searcher = None
+_worker_search_id = None
+
+def _init_search_worker(stop_event, hash_mb):
+    global _worker_searcher
+    _worker_searcher = Searcher(TranspositionTable(hash_mb), stop_event)
+
+def _search_root_move(task):
+    """Pool task: score one root move for the side playing it.
+
+    Returns (move, score or None if aborted, nodes, PV starting with move).
+    """
+    global _worker_search_id
+    board, move, depth, reduction, alpha, beta, deadline, node_limit, search_id = task
+    searcher = _worker_searcher
+    if search_id != _worker_search_id:
+        # First task of a new search: age the table so entries from earlier moves can be replaced
+        _worker_search_id = search_id
+        searcher.tt.new_search()
+    searcher.nodes = 0
+    searcher.deadline = deadline
+    searcher.node_limit = node_limit
+    board.make_move(move)
+    try:
+        # The serial root loop's principal variation search: a (possibly reduced) null-window
+        # scout, widened only for moves that beat alpha
+        score = -searcher.negamax(board, depth - 1 - reduction, -alpha - 1, -alpha, 1)[0]
+        if score > alpha and reduction:
+            score = -searcher.negamax(board, depth - 1, -alpha - 1, -alpha, 1)[0]
+        if alpha < score < beta:
+            score = -searcher.negamax(board, depth - 1, -beta, -alpha, 1)[0]
+    except SearchAborted:
+        return move, None, searcher.nodes, ()
+    return move, score, searcher.nodes, (move,) + searcher.pv[1]
+
+class ParallelSearcher(Searcher):
+    """Searcher that splits each root iteration across a pool of processes.
+
+    The first (best-ordered) root move is searched here to establish a bound;
+    the remaining root moves are then scored in parallel against that bound,
+    each worker keeping its own transposition table, the size of this
+    searcher's, between searches. Resizing or clearing tt leaves the
+    workers' tables alone; make a new ParallelSearcher for that. With a
+    single worker it searches serially.
+
+    Workers only import the engine package, so any start method works.
+    """
+
+    def __init__(self, workers=SEARCH_WORKERS, tt=None, context=None, stop_event=None):
+        context = context or multiprocessing.get_context()
+        stop_event = stop_event if stop_event is not None else context.Event()
+        super().__init__(tt, stop_event)
+        self.workers = workers
+        self.pool = None
+        if workers > 1:
+            self.pool = context.Pool(workers, initializer=_init_search_worker, initargs=(stop_event, self.tt.size_mb))
+
+    def search_root(self, position, depth, alpha=-INFINITY, beta=INFINITY):
+        moves = self.root_moves
+        if self.pool is None or depth < PARALLEL_MIN_DEPTH or len(moves) < 2:
+            return super().search_root(position, depth, alpha, beta)
+        # Worker node counts arrive in batches, so the node budget may be spent between checks
+        if self.out_of_budget():
+            raise SearchAborted
+        self.nodes += 1
+        best_move = moves[0]
+        undo = position.make_move(best_move)
+        best_score = -self.negamax(position, depth - 1, -beta, -alpha, 1)[0]
+        position.unmake_move(best_move, undo)
+        self.pv[0] = (best_move,) + self.pv[1]
+        if best_score >= beta:
+            return best_score, best_move
+        # Each worker may use what is left of the node budget; start_time identifies this search
+        node_limit = None if self.node_limit is None else max(1, self.node_limit - self.nodes)
+        tasks = [(position, move, depth, reduction, max(alpha, best_score), beta, self.deadline, node_limit,
+                  self.start_time) for move, reduction in zip(moves[1:], self.root_reductions(position, depth))]
+        aborted = False
+        # Drain every result even after an abort so no stale task outlives this search
+        for move, score, nodes, pv in self.pool.imap_unordered(_search_root_move, tasks):
+            self.nodes += nodes
+            if score is None:
+                aborted = True
+            elif score > best_score:
+                best_score, best_move = score, move
+                self.pv[0] = pv
+        if aborted:
+            raise SearchAborted
+        if best_score <= alpha:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.tt.store(position.hash_key, depth, score_to_tt(best_score, 0), bound, best_move)
+        return best_score, best_move
+
+    def root_reductions(self, position, depth):
+        """Late move reductions for root moves after the first, by the same rule as negamax"""
+        color = position.side_to_move
+        if not self.late_move_reductions or depth < LMR_MIN_DEPTH or position.is_in_check(color):
+            return [0] * (len(self.root_moves) - 1)
+        squares = position.squares
+        killers = self.killers[0]
+        reductions = []
+        for index, move in enumerate(self.root_moves[1:], 1):
+            reduction = 0
+            if index >= LMR_MIN_MOVES and squares[move >> 6 & 63] == EMPTY and not move >> 12 and move not in killers:
+                undo = position.make_move(move)
+                if not position.is_in_check(position.side_to_move):
+                    reduction = 2 if depth >= 6 and index >= 6 else 1
+                position.unmake_move(move, undo)
+            reductions.append(reduction)
+        return reductions
+
+    def close(self):
+        if self.pool:
+            self.pool.terminate()
+            self.pool = None
+
+def _run_search_process(workers, stop_event, requests, messages):
+    """Body of a SearchProcess: search each requested position, reporting back over messages"""
+    searcher = ParallelSearcher(workers, stop_event=stop_event)
+    try:
+        for search_id, board, time_limit in iter(requests.get, None):
+            def report(info, search_id=search_id):
+                messages.put((search_id, 'progress', info))
+            _, best_move, _ = searcher.iterative_deepening(board, time_limit, on_iteration=report)
+            messages.put((search_id, 'done', best_move))
+    finally:
+        searcher.close()
+
+class SearchProcess:
+    """A ParallelSearcher (serial with one worker) living in a process of its own.
+
+    A search running on a thread of the UI's process holds the GIL for most
+    of its time and makes frames stutter; here the UI process only passes
+    positions and messages through queues. The table survives from move to
+    move. Spawned by default, so the process inherits no SDL or window
+    state from its parent.
+    """
+
+    def __init__(self, workers=1, context=None):
+        context = context or multiprocessing.get_context('spawn')
+        self.stop_event = context.Event()
+        self.requests = context.Queue()
+        self.messages = context.Queue()
+        self.search_id = 0
+        self.process = context.Process(target=_run_search_process,
+                                       args=(workers, self.stop_event, self.requests, self.messages))
+        self.process.start()
+
+    def start(self, board, time_limit):
+        """Queue a search of board and return its id"""
+        self.search_id += 1
+        self.stop_event.clear()
+        self.requests.put((self.search_id, board, time_limit))
+        return self.search_id
+
+    def poll(self, search_id):
+        """(kind, payload) messages that have arrived for search_id; others are from cancelled searches.
+
+        If the process has died, the search ends with ('done', None).
+        """
+        messages = []
+        while True:
+            try:
+                message_id, kind, payload = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if message_id == search_id:
+                messages.append((kind, payload))
+        if not self.process.is_alive() and not any(kind == 'done' for kind, _ in messages):
+            messages.append(('done', None))
+        return messages
+
+    def cancel(self, search_id):
+        """Stop search_id and wait until the process has finished with it, or has died"""
+        self.stop_event.set()
+        while True:
+            try:
+                message_id, kind, _ = self.messages.get(timeout=SEARCH_PROCESS_POLL_INTERVAL)
+            except queue.Empty:
+                if not self.process.is_alive():
+                    return
+                continue
+            if message_id == search_id and kind == 'done':
+                return
+
+    def close(self):
+        self.requests.put(None)
+        self.stop_event.set()
+        self.process.join(SEARCH_PROCESS_EXIT_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
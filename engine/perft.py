@@ -0,0 +1,56 @@
+"""Move generation checks: perft node counts, per-move divides and the standard validation suite"""
+
+import time
+
+from .position import Position, START_FEN, move_to_uci
+
+# Well-known perft positions with their published leaf counts by depth
+PERFT_SUITE = [
+    (START_FEN, [20, 400, 8902, 197281, 4865609]),
+    ('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1', [48, 2039, 97862, 4085603]),
+    ('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1', [14, 191, 2812, 43238, 674624]),
+    ('r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1', [6, 264, 9467, 422333]),
+    ('rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8', [44, 1486, 62379, 2103487]),
+    ('r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10', [46, 2079, 89890, 3894594]),
+]
+
+def perft(board, depth):
+    """Number of leaf nodes of the legal move tree depth plies deep"""
+    moves = board.legal_moves(board.side_to_move)
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    for move in moves:
+        undo = board.make_move(move)
+        nodes += perft(board, depth - 1)
+        board.unmake_move(move, undo)
+    return nodes
+
+def divide(board, depth):
+    """Print the perft count below each root move, then the total with nodes per second"""
+    start = time.perf_counter()
+    total = 0
+    for move in sorted(board.legal_moves(board.side_to_move), key=move_to_uci):
+        undo = board.make_move(move)
+        nodes = perft(board, depth - 1)
+        board.unmake_move(move, undo)
+        print(f"{move_to_uci(move)}: {nodes}")
+        total += nodes
+    elapsed = time.perf_counter() - start
+    print(f"\nNodes: {total}  time {elapsed:.2f}s  {total / max(elapsed, 1e-9):,.0f} nps")
+    return total
+
+def validate_perft(max_depth=3):
+    """Check move generation against PERFT_SUITE; returns whether every count matched"""
+    all_passed = True
+    for fen, counts in PERFT_SUITE:
+        board = Position.from_fen(fen)
+        for depth, expected in enumerate(counts[:max_depth], 1):
+            start = time.perf_counter()
+            nodes = perft(board, depth)
+            elapsed = time.perf_counter() - start
+            passed = nodes == expected
+            all_passed = all_passed and passed
+            print(f"{'ok  ' if passed else 'FAIL'} depth {depth} {nodes:>9} (expected {expected:>9})  "
+                  f"{nodes / max(elapsed, 1e-9):>9,.0f} nps  {fen}")
+    return all_passed
@@ -0,0 +1,89 @@
+"""Minimal PGN reading: split a collection into games and resolve SAN moves against a Position"""
+
+import re
+
+from .bitboard import PAWN, PIECE_KIND
+from .position import START_FEN, Position, parse_square, square_name
+
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+SAN_PIECES = 'PNBRQK'  # Indexed by piece type
+
+# Comments, variations, NAGs and move numbers carry nothing the book needs
+_TOKEN = re.compile(r'\{[^}]*\}|;[^\n]*|\$\d+|\(|\)|\d+\.+|[^\s(){};]+')
+_SAN = re.compile(r'^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$')
+
+def parse_san(board, san):
+    """The legal packed move that Standard Algebraic Notation `san` names, or None"""
+    san = san.rstrip('+#!?')
+    color = board.side_to_move
+    moves = board.legal_moves(color)
+    if san.replace('0', 'O') in ('O-O', 'O-O-O'):
+        king_sq = board.king_squares[color]
+        to_sq = king_sq + (2 if san.replace('0', 'O') == 'O-O' else -2)
+        move = king_sq | (to_sq << 6)
+        return move if move in moves else None
+    match = _SAN.match(san)
+    if not match:
+        return None
+    piece, from_file, from_rank, target, promotion = match.groups()
+    kind = SAN_PIECES.index(piece) if piece else PAWN
+    to_sq = parse_square(target)
+    promotion = SAN_PIECES.index(promotion) if promotion else 0
+    candidates = []
+    for move in moves:
+        from_sq = move & 63
+        if (move >> 6 & 63 != to_sq or move >> 12 != promotion
+                or PIECE_KIND[board.squares[from_sq]] != kind):
+            continue
+        name = square_name(from_sq)
+        if (from_file and name[0] != from_file) or (from_rank and name[1] != from_rank):
+            continue
+        candidates.append(move)
+    return candidates[0] if len(candidates) == 1 else None
+
+def read_games(stream):
+    """Yield (headers, san_moves, result) for each game in a PGN text stream"""
+    headers = {}
+    movetext = []
+    for line in stream:
+        line = line.strip()
+        if line.startswith('['):
+            if movetext:
+                yield _finish_game(headers, movetext)
+                headers, movetext = {}, []
+            key, _, value = line[1:-1].partition(' ')
+            headers[key] = value.strip('"')
+        elif line:
+            movetext.append(line)
+    if headers or movetext:
+        yield _finish_game(headers, movetext)
+
+def _finish_game(headers, movetext):
+    moves = []
+    result = headers.get('Result', '*')
+    depth = 0  # Nesting level of variations being skipped
+    for token in _TOKEN.findall('\n'.join(movetext)):
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        elif depth or token[0] in '{;$' or token.rstrip('.').isdigit():
+            continue
+        elif token in RESULTS:
+            result = token
+        else:
+            moves.append(token)
+    return headers, moves, result
+
+def game_positions(headers, san_moves):
+    """Yield (position, packed move) through a game, stopping at the first unreadable move.
+
+    The same Position is updated in place once the caller has seen each move.
+    """
+    board = Position.from_fen(headers.get('FEN', START_FEN))
+    for san in san_moves:
+        move = parse_san(board, san)
+        if move is None:
+            return
+        yield board, move
+        board.make_move(move)
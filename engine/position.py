@@ -0,0 +1,617 @@
+"""Bitboard position with incremental hashing and evaluation, FEN and legal move generation"""
+
+import random
+
+from .bitboard import (
+    BETWEEN, BISHOP, BISHOP_LINES, BISHOP_RAYS, BLACK_KINGSIDE, BLACK_QUEENSIDE, BOARD_SIZE,
+    CASTLING_MASKS, CASTLING_MOVES, COLORS, EMPTY, FULL_BOARD, KING, KING_ATTACKS, KNIGHT,
+    KNIGHT_ATTACKS, PAWN, PAWN_ATTACKS, PIECE_CODES, PIECE_COLOR, PIECE_KIND, PIECE_TUPLES,
+    PROMOTION_KINDS, PROMOTION_RANKS, QUEEN, ROOK, ROOK_LINES, ROOK_RAYS, WHITE_KINGSIDE,
+    WHITE_QUEENSIDE, queen_attacks, slider_attacks, squares_of
+)
+from .evaluation import MAX_PHASE, PIECE_PHASE, PIECE_VALUE_LIST, PST_ENDGAME, PST_MIDDLEGAME
+
+# Zobrist keys: one random 64-bit number per (piece, square), one for black to move,
+# one per castling right and one per en passant file
+_zobrist_random = random.Random(0x5EED)
+ZOBRIST_PIECES = [[_zobrist_random.getrandbits(64) for _ in range(64)] for _ in range(12)]
+ZOBRIST_SIDE = _zobrist_random.getrandbits(64)
+_castling_keys = [_zobrist_random.getrandbits(64) for _ in range(4)]
+ZOBRIST_CASTLING = [0] * 16
+for _rights in range(16):
+    for _bit in range(4):
+        if _rights >> _bit & 1:
+            ZOBRIST_CASTLING[_rights] ^= _castling_keys[_bit]
+ZOBRIST_EP_FILE = [_zobrist_random.getrandbits(64) for _ in range(BOARD_SIZE)]
+
+START_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+FEN_PIECES = 'PNBRQKpnbrqk'  # Indexed by piece code
+
+# Moves are packed into ints: from square in bits 0-5, to square in bits 6-11 and the
+# promotion piece type (KNIGHT..QUEEN, 0 for none) in bits 12-14. Castling is the king's
+# two-square move and en passant the pawn's diagonal step onto the en passant square.
+def encode_move(from_sq, to_sq, promotion=0):
+    return from_sq | (to_sq << 6) | (promotion << 12)
+
+def move_to_positions(move):
+    """Convert a packed move to the ((row, col), (row, col)) pair used by the UI"""
+    return divmod(move & 63, BOARD_SIZE), divmod(move >> 6 & 63, BOARD_SIZE)
+
+def square_name(sq):
+    return 'abcdefgh'[sq % BOARD_SIZE] + str(sq // BOARD_SIZE + 1)
+
+def parse_square(name):
+    return (int(name[1]) - 1) * BOARD_SIZE + 'abcdefgh'.index(name[0])
+
+def move_to_uci(move):
+    """Coordinate notation such as 'e2e4' or 'e7e8q'"""
+    text = square_name(move & 63) + square_name(move >> 6 & 63)
+    if move >> 12:
+        text += FEN_PIECES[6 + (move >> 12)]
+    return text
+
+def move_from_uci(text):
+    promotion = FEN_PIECES.index(text[4].lower()) - 6 if len(text) > 4 else 0
+    return encode_move(parse_square(text[:2]), parse_square(text[2:4]), promotion)
+
+class Position:
+    """Chess position kept as one 64-bit mask per color and piece type.
+
+    A square-indexed mailbox (`squares`) mirrors the bitboards so piece lookups
+    stay O(1), and `position[row][col]` still yields '' or ('white', 'pawn')
+    style tuples so drawing code can treat it like the old list-of-lists board.
+    """
+
+    def __init__(self):
+        self.pieces = [[0] * 6, [0] * 6]
+        self.occupancy = [0, 0]
+        self.squares = [EMPTY] * 64
+        self.side_to_move = 0
+        self.hash_key = 0
+        # Incremental evaluation terms, from white's point of view
+        self.mg_score = 0
+        self.eg_score = 0
+        self.phase = 0
+        self.king_squares = [None, None]
+        self.castling_rights = 0
+        self.ep_square = None  # Square a pawn just skipped over, when an enemy pawn could take it
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+
+    @classmethod
+    def from_board(cls, board, side_to_move='white'):
+        """Build a position from a list-of-lists board, granting castling to unmoved kings and rooks"""
+        position = cls()
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                piece = board[row][col]
+                if piece:
+                    position.put_piece(row * BOARD_SIZE + col, PIECE_CODES[piece])
+        position.side_to_move = COLORS.index(side_to_move)
+        for color in range(2):
+            for right, king_from, _, rook_from, _, _, _ in CASTLING_MOVES[color]:
+                if (position.squares[king_from] == color * 6 + KING
+                        and position.squares[rook_from] == color * 6 + ROOK):
+                    position.castling_rights |= right
+        position.hash_key = position.compute_hash()
+        return position
+
+    @classmethod
+    def from_fen(cls, fen):
+        """Build a position from Forsyth-Edwards Notation"""
+        fields = fen.split()
+        position = cls()
+        for row, rank in enumerate(reversed(fields[0].split('/'))):
+            col = 0
+            for char in rank:
+                if char.isdigit():
+                    col += int(char)
+                else:
+                    position.put_piece(row * BOARD_SIZE + col, FEN_PIECES.index(char))
+                    col += 1
+        position.side_to_move = 'wb'.index(fields[1]) if len(fields) > 1 else 0
+        if len(fields) > 2:
+            for char in fields[2].replace('-', ''):
+                position.castling_rights |= {'K': WHITE_KINGSIDE, 'Q': WHITE_QUEENSIDE,
+                                             'k': BLACK_KINGSIDE, 'q': BLACK_QUEENSIDE}[char]
+        if len(fields) > 3 and fields[3] != '-':
+            ep_square = parse_square(fields[3])
+            # Only keep it when a pawn could actually capture, matching what make_move records
+            if PAWN_ATTACKS[position.side_to_move ^ 1][ep_square] & position.pieces[position.side_to_move][PAWN]:
+                position.ep_square = ep_square
+        if len(fields) > 5:
+            position.halfmove_clock = int(fields[4])
+            position.fullmove_number = int(fields[5])
+        position.hash_key = position.compute_hash()
+        return position
+
+    def fen(self):
+        ranks = []
+        for row in range(BOARD_SIZE - 1, -1, -1):
+            rank = ''
+            empty = 0
+            for code in self.squares[row * BOARD_SIZE:(row + 1) * BOARD_SIZE]:
+                if code == EMPTY:
+                    empty += 1
+                    continue
+                if empty:
+                    rank += str(empty)
+                    empty = 0
+                rank += FEN_PIECES[code]
+            ranks.append(rank + (str(empty) if empty else ''))
+        castling = ''.join(char for char, right in zip('KQkq', (WHITE_KINGSIDE, WHITE_QUEENSIDE,
+                                                                BLACK_KINGSIDE, BLACK_QUEENSIDE))
+                           if self.castling_rights & right)
+        ep = square_name(self.ep_square) if self.ep_square is not None else '-'
+        return '%s %s %s %s %d %d' % ('/'.join(ranks), 'wb'[self.side_to_move], castling or '-', ep,
+                                      self.halfmove_clock, self.fullmove_number)
+
+    def copy(self):
+        position = Position.__new__(Position)
+        position.pieces = [self.pieces[0][:], self.pieces[1][:]]
+        position.occupancy = self.occupancy[:]
+        position.squares = self.squares[:]
+        position.side_to_move = self.side_to_move
+        position.hash_key = self.hash_key
+        position.mg_score = self.mg_score
+        position.eg_score = self.eg_score
+        position.phase = self.phase
+        position.king_squares = self.king_squares[:]
+        position.castling_rights = self.castling_rights
+        position.ep_square = self.ep_square
+        position.halfmove_clock = self.halfmove_clock
+        position.fullmove_number = self.fullmove_number
+        return position
+
+    def __getitem__(self, row):
+        start = row * BOARD_SIZE
+        return [PIECE_TUPLES[code] for code in self.squares[start:start + BOARD_SIZE]]
+
+    def compute_hash(self):
+        """Zobrist key of the position built from scratch (make_move keeps hash_key up to date)"""
+        key = ZOBRIST_SIDE if self.side_to_move else 0
+        key ^= ZOBRIST_CASTLING[self.castling_rights]
+        if self.ep_square is not None:
+            key ^= ZOBRIST_EP_FILE[self.ep_square % BOARD_SIZE]
+        for sq, code in enumerate(self.squares):
+            if code != EMPTY:
+                key ^= ZOBRIST_PIECES[code][sq]
+        return key
+
+    def put_piece(self, sq, code):
+        bit = 1 << sq
+        color = PIECE_COLOR[code]
+        self.pieces[color][PIECE_KIND[code]] |= bit
+        self.occupancy[color] |= bit
+        self.squares[sq] = code
+        self.hash_key ^= ZOBRIST_PIECES[code][sq]
+        self.mg_score += PST_MIDDLEGAME[code][sq]
+        self.eg_score += PST_ENDGAME[code][sq]
+        self.phase += PIECE_PHASE[code]
+        if PIECE_KIND[code] == KING:
+            self.king_squares[color] = sq
+
+    def remove_piece(self, sq):
+        code = self.squares[sq]
+        if code != EMPTY:
+            mask = ~(1 << sq)
+            color = PIECE_COLOR[code]
+            self.pieces[color][PIECE_KIND[code]] &= mask
+            self.occupancy[color] &= mask
+            self.squares[sq] = EMPTY
+            self.hash_key ^= ZOBRIST_PIECES[code][sq]
+            self.mg_score -= PST_MIDDLEGAME[code][sq]
+            self.eg_score -= PST_ENDGAME[code][sq]
+            self.phase -= PIECE_PHASE[code]
+            if PIECE_KIND[code] == KING:
+                self.king_squares[color] = None
+        return code
+
+    def is_special_move(self, move, code, ep_square):
+        """Whether move is a promotion, en passant capture or castling, which make_move plays piece by piece"""
+        kind = PIECE_KIND[code]
+        to_sq = move >> 6 & 63
+        return bool(move >> 12 or (kind == PAWN and to_sq == ep_square)
+                    or (kind == KING and abs(to_sq - (move & 63)) == 2))
+
+    def make_move(self, move):
+        """Play a packed move in place and return the undo record for unmake_move"""
+        from_sq = move & 63
+        to_sq = move >> 6 & 63
+        squares = self.squares
+        code = squares[from_sq]
+        captured = squares[to_sq]
+        color = PIECE_COLOR[code]
+        kind = PIECE_KIND[code]
+        key = self.hash_key
+        ep_square = self.ep_square
+        rights = self.castling_rights
+        undo = (captured, self.side_to_move, key, self.mg_score, self.eg_score, self.phase,
+                rights, ep_square, self.halfmove_clock)
+        key ^= ZOBRIST_SIDE
+        if ep_square is not None:
+            key ^= ZOBRIST_EP_FILE[ep_square & 7]
+            self.ep_square = None
+        if rights:
+            new_rights = rights & CASTLING_MASKS[from_sq] & CASTLING_MASKS[to_sq]
+            if new_rights != rights:
+                key ^= ZOBRIST_CASTLING[rights] ^ ZOBRIST_CASTLING[new_rights]
+                self.castling_rights = new_rights
+        if self.is_special_move(move, code, ep_square):
+            self.hash_key = key
+            self._make_special_move(move, code, captured)
+            key = self.hash_key
+        else:
+            to_bit = 1 << to_sq
+            move_bits = (1 << from_sq) | to_bit
+            self.pieces[color][kind] ^= move_bits
+            self.occupancy[color] ^= move_bits
+            if kind == KING:
+                self.king_squares[color] = to_sq
+            zobrist = ZOBRIST_PIECES[code]
+            key ^= zobrist[from_sq] ^ zobrist[to_sq]
+            self.mg_score += PST_MIDDLEGAME[code][to_sq] - PST_MIDDLEGAME[code][from_sq]
+            self.eg_score += PST_ENDGAME[code][to_sq] - PST_ENDGAME[code][from_sq]
+            if captured != EMPTY:
+                self.pieces[color ^ 1][PIECE_KIND[captured]] ^= to_bit
+                self.occupancy[color ^ 1] ^= to_bit
+                key ^= ZOBRIST_PIECES[captured][to_sq]
+                self.mg_score -= PST_MIDDLEGAME[captured][to_sq]
+                self.eg_score -= PST_ENDGAME[captured][to_sq]
+                self.phase -= PIECE_PHASE[captured]
+            squares[to_sq] = code
+            squares[from_sq] = EMPTY
+        if kind == PAWN or captured != EMPTY:
+            self.halfmove_clock = 0
+            if kind == PAWN and abs(to_sq - from_sq) == 16:
+                skipped = (from_sq + to_sq) >> 1
+                if PAWN_ATTACKS[color][skipped] & self.pieces[color ^ 1][PAWN]:
+                    self.ep_square = skipped
+                    key ^= ZOBRIST_EP_FILE[skipped & 7]
+        else:
+            self.halfmove_clock += 1
+        if color:
+            self.fullmove_number += 1
+        self.side_to_move = color ^ 1
+        self.hash_key = key
+        return undo
+
+    def _make_special_move(self, move, code, captured):
+        """Promotions, en passant and castling go through put_piece/remove_piece"""
+        from_sq = move & 63
+        to_sq = move >> 6 & 63
+        color = PIECE_COLOR[code]
+        self.remove_piece(from_sq)
+        if captured != EMPTY:
+            self.remove_piece(to_sq)
+        self.put_piece(to_sq, color * 6 + (move >> 12) if move >> 12 else code)
+        if PIECE_KIND[code] == KING:
+            _, _, _, rook_from, rook_to, _, _ = CASTLING_MOVES[color][to_sq < from_sq]
+            self.put_piece(rook_to, self.remove_piece(rook_from))
+        elif captured == EMPTY and (to_sq - from_sq) % BOARD_SIZE:
+            # En passant: the captured pawn stands beside the mover, behind the target square
+            self.remove_piece(to_sq - 8 if color == 0 else to_sq + 8)
+
+    def unmake_move(self, move, undo):
+        """Take back a move played with make_move, restoring the position exactly"""
+        from_sq = move & 63
+        to_sq = move >> 6 & 63
+        captured = undo[0]
+        squares = self.squares
+        code = squares[to_sq]
+        color = PIECE_COLOR[code]
+        kind = PIECE_KIND[code]
+        if self.is_special_move(move, code, undo[7]):
+            self._unmake_special_move(move, code, captured)
+        else:
+            to_bit = 1 << to_sq
+            move_bits = (1 << from_sq) | to_bit
+            self.pieces[color][kind] ^= move_bits
+            self.occupancy[color] ^= move_bits
+            if kind == KING:
+                self.king_squares[color] = from_sq
+            if captured != EMPTY:
+                self.pieces[color ^ 1][PIECE_KIND[captured]] ^= to_bit
+                self.occupancy[color ^ 1] ^= to_bit
+            squares[from_sq] = code
+            squares[to_sq] = captured
+        if color:
+            self.fullmove_number -= 1
+        (_, self.side_to_move, self.hash_key, self.mg_score, self.eg_score, self.phase,
+         self.castling_rights, self.ep_square, self.halfmove_clock) = undo
+
+    def _unmake_special_move(self, move, code, captured):
+        from_sq = move & 63
+        to_sq = move >> 6 & 63
+        color = PIECE_COLOR[code]
+        self.remove_piece(to_sq)
+        self.put_piece(from_sq, color * 6 + PAWN if move >> 12 else code)
+        if captured != EMPTY:
+            self.put_piece(to_sq, captured)
+        elif PIECE_KIND[code] == KING:
+            _, _, _, rook_from, rook_to, _, _ = CASTLING_MOVES[color][to_sq < from_sq]
+            self.put_piece(rook_from, self.remove_piece(rook_to))
+        elif not move >> 12:
+            self.put_piece(to_sq - 8 if color == 0 else to_sq + 8, (color ^ 1) * 6 + PAWN)
+
+    def make_null_move(self):
+        """Pass the turn without moving (for null-move pruning); returns the undo record"""
+        undo = (self.hash_key, self.ep_square)
+        self.side_to_move ^= 1
+        self.hash_key ^= ZOBRIST_SIDE
+        if self.ep_square is not None:
+            self.hash_key ^= ZOBRIST_EP_FILE[self.ep_square & 7]
+            self.ep_square = None
+        return undo
+
+    def unmake_null_move(self, undo):
+        self.side_to_move ^= 1
+        self.hash_key, self.ep_square = undo
+
+    def has_non_pawn_material(self, color):
+        """Whether color has anything besides king and pawns (null moves are unsafe otherwise)"""
+        pieces = self.pieces[color]
+        return bool(pieces[KNIGHT] | pieces[BISHOP] | pieces[ROOK] | pieces[QUEEN])
+
+    def move_piece(self, start_pos, end_pos, promotion=QUEEN):
+        """Move whatever stands on start_pos to end_pos, capturing anything there.
+
+        A pawn reaching the last rank becomes `promotion`; castling and en
+        passant follow from the king or pawn move itself.
+        """
+        from_sq = start_pos[0] * BOARD_SIZE + start_pos[1]
+        to_sq = end_pos[0] * BOARD_SIZE + end_pos[1]
+        if PIECE_KIND[self.squares[from_sq]] != PAWN or not PROMOTION_RANKS >> to_sq & 1:
+            promotion = 0
+        self.make_move(encode_move(from_sq, to_sq, promotion))
+
+    def attacks_from(self, sq, code):
+        """Squares attacked by the piece `code` standing on sq (pawns: diagonal captures only)"""
+        kind = PIECE_KIND[code]
+        if kind == PAWN:
+            return PAWN_ATTACKS[PIECE_COLOR[code]][sq]
+        if kind == KNIGHT:
+            return KNIGHT_ATTACKS[sq]
+        if kind == KING:
+            return KING_ATTACKS[sq]
+        occupied = self.occupancy[0] | self.occupancy[1]
+        if kind == BISHOP:
+            return slider_attacks(sq, occupied, BISHOP_RAYS)
+        if kind == ROOK:
+            return slider_attacks(sq, occupied, ROOK_RAYS)
+        return queen_attacks(sq, occupied)
+
+    def targets_from(self, sq, code):
+        """Pseudo-legal destination squares for the piece `code` on sq"""
+        color = PIECE_COLOR[code]
+        if PIECE_KIND[code] != PAWN:
+            return self.attacks_from(sq, code) & ~self.occupancy[color]
+        empty = ~(self.occupancy[0] | self.occupancy[1])
+        enemy = self.occupancy[color ^ 1]
+        if self.ep_square is not None:
+            enemy |= 1 << self.ep_square
+        targets = PAWN_ATTACKS[color][sq] & enemy
+        if color == 0:
+            push = (1 << (sq + 8)) & empty if sq < 56 else 0
+            if push and 8 <= sq < 16:
+                push |= (1 << (sq + 16)) & empty
+        else:
+            push = (1 << (sq - 8)) & empty if sq >= 8 else 0
+            if push and 48 <= sq < 56:
+                push |= (1 << (sq - 16)) & empty
+        return targets | push
+
+    def generate_moves(self, color):
+        """Pseudo-legal moves for color as packed ints (castling is only generated by legal_moves)"""
+        moves = []
+        squares = self.squares
+        for from_sq in squares_of(self.occupancy[color]):
+            code = squares[from_sq]
+            for to_sq in squares_of(self.targets_from(from_sq, code)):
+                if PIECE_KIND[code] == PAWN and PROMOTION_RANKS >> to_sq & 1:
+                    moves.extend(from_sq | (to_sq << 6) | (kind << 12) for kind in PROMOTION_KINDS)
+                else:
+                    moves.append(from_sq | (to_sq << 6))
+        return moves
+
+    def king_square(self, color):
+        return self.king_squares[color]
+
+    def is_square_attacked(self, sq, by_color, occupied=None):
+        """Whether any piece of by_color attacks sq, found by looking outward from sq.
+
+        `occupied` overrides the blockers used for sliding pieces, e.g. to look
+        through the king when testing the squares it could step to.
+        """
+        enemy = self.pieces[by_color]
+        if KNIGHT_ATTACKS[sq] & enemy[KNIGHT] or KING_ATTACKS[sq] & enemy[KING]:
+            return True
+        # A pawn attacks sq exactly when a pawn of the other color on sq would attack it back
+        if PAWN_ATTACKS[by_color ^ 1][sq] & enemy[PAWN]:
+            return True
+        if occupied is None:
+            occupied = self.occupancy[0] | self.occupancy[1]
+        rooks = (enemy[ROOK] | enemy[QUEEN]) & ROOK_LINES[sq]
+        if rooks and slider_attacks(sq, occupied, ROOK_RAYS) & rooks:
+            return True
+        bishops = (enemy[BISHOP] | enemy[QUEEN]) & BISHOP_LINES[sq]
+        return bool(bishops and slider_attacks(sq, occupied, BISHOP_RAYS) & bishops)
+
+    def is_in_check(self, color):
+        king_sq = self.king_squares[color]
+        if king_sq is None:
+            return False
+        return self.is_square_attacked(king_sq, color ^ 1)
+
+    def legality_masks(self, color):
+        """Checking pieces and pins against color's king, computed once per position.
+
+        Returns (check_mask, pins): check_mask is the set of squares a non-king
+        move must land on (everything when not in check, the checker and the
+        squares between it and the king in single check, nothing in double
+        check), and pins maps each pinned piece's square to the line it may
+        still move along.
+        """
+        king_sq = self.king_squares[color]
+        enemy = self.pieces[color ^ 1]
+        own = self.occupancy[color]
+        occupied = own | self.occupancy[color ^ 1]
+        checkers = (KNIGHT_ATTACKS[king_sq] & enemy[KNIGHT]) | (PAWN_ATTACKS[color][king_sq] & enemy[PAWN])
+        check_mask = FULL_BOARD
+        pins = {}
+        snipers = (((enemy[ROOK] | enemy[QUEEN]) & ROOK_LINES[king_sq])
+                   | ((enemy[BISHOP] | enemy[QUEEN]) & BISHOP_LINES[king_sq]))
+        between = BETWEEN[king_sq]
+        while snipers:
+            bit = snipers & -snipers
+            snipers ^= bit
+            sniper_sq = bit.bit_length() - 1
+            blockers = between[sniper_sq] & occupied
+            if not blockers:
+                checkers |= bit
+                check_mask = between[sniper_sq] | bit
+            elif not blockers & (blockers - 1) and blockers & own:
+                pins[blockers.bit_length() - 1] = between[sniper_sq] | bit
+        if checkers:
+            if checkers & (checkers - 1):
+                check_mask = 0  # Double check: only the king can move
+            elif check_mask == FULL_BOARD:
+                check_mask = checkers  # A knight or pawn check can only be answered by capturing it
+        return check_mask, pins
+
+    def king_targets(self, king_sq, color):
+        """Squares the king on king_sq can step to without walking into an attack"""
+        # Look through the king itself so it cannot step back along a checking ray
+        them = color ^ 1
+        occupied = (self.occupancy[0] | self.occupancy[1]) ^ (1 << king_sq)
+        targets = 0
+        for to_sq in squares_of(KING_ATTACKS[king_sq] & ~self.occupancy[color]):
+            if not self.is_square_attacked(to_sq, them, occupied):
+                targets |= 1 << to_sq
+        return targets
+
+    def castling_moves(self, color):
+        """Castling moves open to color; the caller checks that the king is not in check"""
+        moves = []
+        rights = self.castling_rights
+        occupied = self.occupancy[0] | self.occupancy[1]
+        for right, king_from, king_to, rook_from, _, empty, crossed in CASTLING_MOVES[color]:
+            if (rights & right and not occupied & empty and self.squares[rook_from] == color * 6 + ROOK
+                    and not any(self.is_square_attacked(sq, color ^ 1) for sq in crossed)):
+                moves.append(king_from | (king_to << 6))
+        return moves
+
+    def legal_targets(self, from_sq):
+        """Legal destination squares for the piece on from_sq, castling included"""
+        code = self.squares[from_sq]
+        if code == EMPTY:
+            return 0
+        targets = 0
+        for move in self.legal_moves(PIECE_COLOR[code]):
+            if move & 63 == from_sq:
+                targets |= 1 << (move >> 6 & 63)
+        return targets
+
+    def legal_moves(self, color, captures_only=False):
+        """Legal moves for color as packed ints, using pin and check masks instead of trial moves.
+
+        En passant captures are the one case the masks miss (both pawns leave the
+        rank at once), so those few are verified by playing them.
+        """
+        target_mask = self.occupancy[color ^ 1] if captures_only else FULL_BOARD
+        king_sq = self.king_squares[color]
+        if king_sq is None:
+            return [move for move in self.generate_moves(color)
+                    if target_mask >> (move >> 6 & 63) & 1 or move >> 12]
+        check_mask, pins = self.legality_masks(color)
+        moves = [king_sq | (to_sq << 6) for to_sq in squares_of(self.king_targets(king_sq, color) & target_mask)]
+        if not check_mask:
+            return moves
+        if self.castling_rights and check_mask == FULL_BOARD and not captures_only:
+            moves.extend(self.castling_moves(color))
+        # Pushes onto the last rank count as captures for quiescence, which only tries queening
+        pawn_mask = check_mask & (target_mask | PROMOTION_RANKS)
+        promotion_kinds = (QUEEN,) if captures_only else PROMOTION_KINDS
+        check_mask &= target_mask
+        squares = self.squares
+        pawn_code = color * 6 + PAWN
+        ep_square = self.ep_square
+        for from_sq in squares_of(self.occupancy[color] ^ (1 << king_sq)):
+            code = squares[from_sq]
+            targets = self.targets_from(from_sq, code)
+            if code == pawn_code:
+                if ep_square is not None and targets >> ep_square & 1:
+                    targets ^= 1 << ep_square
+                    move = from_sq | (ep_square << 6)
+                    undo = self.make_move(move)
+                    if not self.is_in_check(color):
+                        moves.append(move)
+                    self.unmake_move(move, undo)
+                targets &= pawn_mask
+                if from_sq in pins:
+                    targets &= pins[from_sq]
+                while targets:
+                    bit = targets & -targets
+                    targets ^= bit
+                    to_sq = bit.bit_length() - 1
+                    if bit & PROMOTION_RANKS:
+                        moves.extend(from_sq | (to_sq << 6) | (kind << 12) for kind in promotion_kinds)
+                    else:
+                        moves.append(from_sq | (to_sq << 6))
+                continue
+            targets &= check_mask
+            if from_sq in pins:
+                targets &= pins[from_sq]
+            while targets:
+                bit = targets & -targets
+                targets ^= bit
+                moves.append(from_sq | ((bit.bit_length() - 1) << 6))
+        return moves
+
+    def attackers_to(self, sq, occupied):
+        """Pieces of both colors attacking sq, with sliders seeing through anything not in occupied"""
+        white, black = self.pieces
+        rooks = white[ROOK] | white[QUEEN] | black[ROOK] | black[QUEEN]
+        bishops = white[BISHOP] | white[QUEEN] | black[BISHOP] | black[QUEEN]
+        attackers = ((PAWN_ATTACKS[1][sq] & white[PAWN]) | (PAWN_ATTACKS[0][sq] & black[PAWN])
+                     | (KNIGHT_ATTACKS[sq] & (white[KNIGHT] | black[KNIGHT]))
+                     | (KING_ATTACKS[sq] & (white[KING] | black[KING])))
+        if rooks & ROOK_LINES[sq]:
+            attackers |= slider_attacks(sq, occupied, ROOK_RAYS) & rooks
+        if bishops & BISHOP_LINES[sq]:
+            attackers |= slider_attacks(sq, occupied, BISHOP_RAYS) & bishops
+        return attackers & occupied
+
+    def see(self, move):
+        """Static exchange evaluation: material the mover expects to net from the captures on move's target square"""
+        from_sq = move & 63
+        to_sq = move >> 6 & 63
+        squares = self.squares
+        gain = [PIECE_VALUE_LIST[PIECE_KIND[squares[to_sq]]] if squares[to_sq] != EMPTY else 0]
+        attacker_kind = PIECE_KIND[squares[from_sq]]
+        side = PIECE_COLOR[squares[from_sq]] ^ 1
+        occupied = (self.occupancy[0] | self.occupancy[1]) ^ (1 << from_sq)
+        while True:
+            # Speculative score if the piece that just captured is taken in turn
+            gain.append(PIECE_VALUE_LIST[attacker_kind] - gain[-1])
+            if max(-gain[-2], gain[-1]) < 0:
+                break
+            side_attackers = self.attackers_to(to_sq, occupied) & self.occupancy[side]
+            if not side_attackers:
+                break
+            # Recapture with the least valuable piece; removing it uncovers any slider behind
+            for attacker_kind in range(6):
+                candidates = side_attackers & self.pieces[side][attacker_kind]
+                if candidates:
+                    break
+            occupied ^= candidates & -candidates
+            side ^= 1
+        # Unwind, letting each side stop capturing when continuing would lose material
+        for depth in range(len(gain) - 2, 0, -1):
+            gain[depth - 1] = -max(-gain[depth - 1], gain[depth])
+        return gain[0]
+
+    def evaluate(self):
+        """Tapered piece-square evaluation from white's point of view, blended by game phase"""
+        phase = min(self.phase, MAX_PHASE)
+        return (self.mg_score * phase + self.eg_score * (MAX_PHASE - phase)) // MAX_PHASE
@@ -0,0 +1,69 @@
+"""Game-level helpers over Position: the starting board, per-square move lists and game status"""
+
+from .bitboard import BOARD_SIZE, COLORS, PIECE_CODES, squares_of
+from .position import Position
+
+def create_board():
+    board = [['' for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+   
+    # Set up pawns
+    for i in range(BOARD_SIZE):
+        board[1][i] = ('white', 'pawn')
+        board[6][i] = ('black', 'pawn')
+   
+    # Set up other pieces
+    pieces = ['rook', 'knight', 'bishop', 'queen', 'king', 'bishop', 'knight', 'rook']
+    for i in range(BOARD_SIZE):
+        board[0][i] = ('white', pieces[i])
+        board[7][i] = ('black', pieces[i])
+   
+    return Position.from_board(board)
+
+def get_raw_moves(board, start_pos, piece):
+    """Get moves without considering check (to avoid recursion)"""
+    sq = start_pos[0] * BOARD_SIZE + start_pos[1]
+    return [divmod(to_sq, BOARD_SIZE) for to_sq in squares_of(board.targets_from(sq, PIECE_CODES[piece]))]
+
+def get_valid_moves(board, start_pos, piece):
+    # Pins and checks are resolved up front, so every target is already legal
+    from_sq = start_pos[0] * BOARD_SIZE + start_pos[1]
+    return [divmod(to_sq, BOARD_SIZE) for to_sq in squares_of(board.legal_targets(from_sq))]
+ 
+def is_in_check(board, color):
+    return board.is_in_check(COLORS.index(color))
+ 
+def is_checkmate(board, color):
+    if not is_in_check(board, color):
+        return False
+   
+    # Any legal move gets us out of check, so it's only checkmate when there are none
+    return not board.legal_moves(COLORS.index(color))
+ 
+def is_stalemate(board, color):
+    if is_in_check(board, color):
+        return False
+   
+    # Check if any piece has valid moves
+    return not board.legal_moves(COLORS.index(color))
+ 
+class GameStatus:
+    """Check, legal moves, checkmate and stalemate for one side, worked out in a single pass"""
+
+    def __init__(self, board, color):
+        color_index = COLORS.index(color)
+        self.hash_key = board.hash_key
+        self.color = color
+        self.in_check = board.is_in_check(color_index)
+        self.legal_moves = board.legal_moves(color_index)
+        self.checkmate = self.in_check and not self.legal_moves
+        self.stalemate = not self.in_check and not self.legal_moves
+
+_game_status_cache = None
+
+def get_game_status(board, color):
+    """GameStatus for color, recomputed only when the position (its Zobrist key) changes"""
+    global _game_status_cache
+    status = _game_status_cache
+    if status is None or status.hash_key != board.hash_key or status.color != color:
+        status = _game_status_cache = GameStatus(board, color)
+    return status
@@ -0,0 +1,558 @@
+"""Alpha-beta search: transposition table, iterative deepening and the background search worker"""
+
+import random
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+from .bitboard import EMPTY, PAWN, PIECE_KIND, QUEEN
+from .evaluation import PIECE_VALUE_LIST
+from .position import move_to_positions, move_to_uci
+from .tablebase import tablebases
+
+# Transposition table settings
+TT_SIZE_MB = 16
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2  # How a stored score relates to the true value
+MATE_SCORE = 1000000
+MATE_THRESHOLD = MATE_SCORE - 1000  # Scores beyond this are mates, stored relative to the node
+
+class TranspositionTable:
+    """Fixed-size table of search results indexed by Zobrist key.
+
+    Each slot is two 64-bit words in flat arrays: the full key, and a packed
+    record of best move (bits 0-15), depth (16-23), bound (24-25), search age
+    (26-31) and score (32-63), so the table uses exactly its configured size.
+    A slot is overwritten when it holds a different position left over from an
+    earlier search, or when the new result was searched at least as deep.
+    """
+    ENTRY_BYTES = 16
+
+    def __init__(self, size_mb=TT_SIZE_MB):
+        self.resize(size_mb)
+
+    def resize(self, size_mb):
+        slots = max(1, int(size_mb * 1024 * 1024) // self.ENTRY_BYTES)
+        slots = 1 << (slots.bit_length() - 1)  # Round down to a power of two so keys can be masked
+        self.size_mb = size_mb
+        self.mask = slots - 1
+        self.keys = array('Q', bytes(8 * slots))
+        self.data = array('Q', bytes(8 * slots))
+        self.age = 0
+
+    def clear(self):
+        self.resize(self.size_mb)
+
+    def new_search(self):
+        self.age = (self.age + 1) & 63
+
+    def probe(self, key):
+        """Return (depth, score, bound, move) stored for key, or None"""
+        index = key & self.mask
+        if self.keys[index] != key:
+            return None
+        data = self.data[index]
+        return (data >> 16 & 0xFF, (data >> 32) - 0x80000000, data >> 24 & 3, data & 0xFFFF)
+
+    def store(self, key, depth, score, bound, move):
+        index = key & self.mask
+        if self.keys[index] != key:
+            old = self.data[index]
+            if (old >> 26 & 63) == self.age and (old >> 16 & 0xFF) > depth:
+                return
+        self.keys[index] = key
+        self.data[index] = ((score + 0x80000000) << 32 | self.age << 26 | bound << 24
+                            | depth << 16 | (move or 0))
+
+_default_table = None
+
+def default_transposition_table():
+    """The table shared by Searchers not given one of their own, allocated on first use.
+
+    Processes that only import the package, or bring their own tables,
+    never pay for it.
+    """
+    global _default_table
+    if _default_table is None:
+        _default_table = TranspositionTable(TT_SIZE_MB)
+    return _default_table
+
+def score_to_tt(score, ply):
+    """Store mate scores as distance from this node rather than from the root"""
+    if score > MATE_THRESHOLD:
+        return score + ply
+    if score < -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+def score_from_tt(score, ply):
+    if score > MATE_THRESHOLD:
+        return score - ply
+    if score < -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+# Search limits
+MAX_SEARCH_DEPTH = 64
+MAX_PLY = 128  # Deepest ply any per-ply table has to cover
+INFINITY = MATE_SCORE + 1
+TIME_CHECK_INTERVAL = 1024  # Nodes between clock reads
+TABLEBASE_PIECES = 3  # Positions with this many pieces, kings included, are looked up in the endgame tables
+
+# Move ordering: hash move, then captures (most valuable victim, least valuable attacker),
+# then the two killer moves for the ply, then quiet moves by history score
+HASH_MOVE_ORDER = 1 << 40
+CAPTURE_ORDER = 1 << 32
+KILLER_ORDER = 1 << 24
+HISTORY_LIMIT = 1 << 20  # History scores are halved once any reaches this, staying below killers
+MVV_LVA = [[victim * 8 + 5 - attacker for attacker in range(6)] for victim in range(6)]
+
+# Selective search settings
+NULL_MOVE_PRUNING = True
+NULL_MOVE_MIN_DEPTH = 3
+LATE_MOVE_REDUCTIONS = True
+LMR_MIN_DEPTH = 3
+LMR_MIN_MOVES = 3  # Moves searched at full depth before quiet moves start being reduced
+
+# Aspiration windows: later iterations start with a window this wide around the previous score
+ASPIRATION_WINDOW = 50
+ASPIRATION_MIN_DEPTH = 4
+
+# Quiescence search settings
+DELTA_MARGIN = 200  # Skip captures that can't lift the score to alpha even with this much to spare
+QUIESCENCE_SEE = True  # Skip captures that static exchange evaluation says lose material
+
+class SearchAborted(Exception):
+    """Raised inside the search when its time budget runs out or it is stopped"""
+
+# Progress report sent after each completed iteration
+SearchInfo = namedtuple('SearchInfo', ['depth', 'score', 'best_move', 'nodes', 'elapsed', 'pv'])
+
+class Searcher:
+    """Alpha-beta search over a Position, sharing one transposition table.
+
+    `negamax` is the core search, scoring positions for the side to move;
+    `minimax` wraps it with white-relative scores for older callers.
+    `iterative_deepening` repeats the search at increasing depths until the
+    time budget is spent and returns the result of the deepest iteration
+    that finished.
+    """
+
+    def __init__(self, tt=None, stop_event=None):
+        self.tt = tt if tt is not None else default_transposition_table()
+        self.tablebases = tablebases
+        self.nodes = 0
+        self.deadline = None
+        self.node_limit = None
+        self.start_time = 0.0
+        self.time_limit = float('inf')
+        # Any object with set/is_set/clear; a multiprocessing Event lets worker processes share it
+        self.stop_event = stop_event if stop_event is not None else threading.Event()
+        self.root_moves = None  # Root move order carried over between iterations
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history = [0] * (12 * 64)  # Indexed by piece code * 64 + destination square
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.use_see = QUIESCENCE_SEE
+        self.null_move = NULL_MOVE_PRUNING
+        self.late_move_reductions = LATE_MOVE_REDUCTIONS
+        # Triangular PV table: pv[ply] is the best line found from that ply, as packed moves
+        self.pv = [()] * (MAX_PLY + 1)
+        self.principal_variation = []  # PV of the last completed iteration
+
+    def stop(self):
+        """Ask a running search (possibly on another thread) to return as soon as possible"""
+        self.stop_event.set()
+
+    def set_time_limit(self, time_limit):
+        """Change the budget of a running iterative_deepening call, still counted from its start"""
+        self.time_limit = time_limit
+        if self.deadline is not None:
+            self.deadline = self.start_time + time_limit
+
+    def probe_tablebase(self, board, ply):
+        """Exact score from the endgame tables for the side to move, or None if they don't cover board"""
+        if (board.occupancy[0] | board.occupancy[1]).bit_count() != TABLEBASE_PIECES or self.tablebases is None:
+            return None
+        entry = self.tablebases.probe(board)
+        if entry is None:
+            return None
+        result, plies = entry
+        # Mates count from the root like every other mate score
+        return result * (MATE_SCORE - ply - plies) if result else 0
+
+    def out_of_budget(self):
+        """Whether the search was stopped or has used up its time or node allowance"""
+        if self.stop_event.is_set():
+            return True
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            return True
+        return self.node_limit is not None and self.nodes >= self.node_limit
+
+    @property
+    def first_move_cutoff_rate(self):
+        """Share of beta cutoffs produced by the first move searched, a measure of ordering quality"""
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def reset_ordering(self):
+        """Forget killers, age the history table and zero the cutoff counters for a new search"""
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history = [value // 8 for value in self.history]
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def order_moves(self, board, moves, tt_move, ply):
+        """Sort moves best-first using only the board's mailbox, with no moves made"""
+        squares = board.squares
+        killer1, killer2 = self.killers[ply]
+        history = self.history
+        keyed = []
+        for move in moves:
+            if move == tt_move:
+                keyed.append((HASH_MOVE_ORDER, move))
+                continue
+            to_sq = move >> 6 & 63
+            victim = squares[to_sq]
+            if victim != EMPTY:
+                key = CAPTURE_ORDER + MVV_LVA[PIECE_KIND[victim]][PIECE_KIND[squares[move & 63]]]
+            elif move >> 12 == QUEEN:
+                key = CAPTURE_ORDER + MVV_LVA[QUEEN][PAWN]
+            elif move == killer1:
+                key = KILLER_ORDER + 1
+            elif move == killer2:
+                key = KILLER_ORDER
+            else:
+                key = history[squares[move & 63] * 64 + to_sq]
+            keyed.append((key, move))
+        keyed.sort(reverse=True)
+        return [move for _, move in keyed]
+
+    def record_cutoff(self, board, move, depth, ply, move_index):
+        """Update the counters, and the killer and history tables for a quiet move, after a beta cutoff"""
+        self.cutoffs += 1
+        if move_index == 0:
+            self.first_move_cutoffs += 1
+        to_sq = move >> 6 & 63
+        squares = board.squares
+        if squares[to_sq] != EMPTY or move >> 12:
+            return
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        index = squares[move & 63] * 64 + to_sq
+        self.history[index] += depth * depth
+        if self.history[index] >= HISTORY_LIMIT:
+            self.history = [value // 2 for value in self.history]
+
+    def negamax(self, board, depth, alpha, beta, ply=0, allow_null=True):
+        """Alpha-beta search; returns (score for the side to move, best packed move or 0)"""
+        self.nodes += 1
+        if not self.nodes % TIME_CHECK_INTERVAL and self.out_of_budget():
+            raise SearchAborted
+        color = board.side_to_move
+        self.pv[ply] = ()
+        if ply:
+            score = self.probe_tablebase(board, ply)
+            if score is not None:
+                return score, 0
+        if depth <= 0:
+            return self.quiescence(board, alpha, beta, ply), 0
+ 
+        alpha_orig = alpha
+ 
+        # Reuse earlier results for this position, and search its best move first
+        tt_move = 0
+        entry = self.tt.probe(board.hash_key)
+        if entry:
+            tt_depth, tt_score, tt_bound, tt_move = entry
+            tt_score = score_from_tt(tt_score, ply)
+            # Cutoffs are left to null-window nodes: a PV node cut here would return no PV to its parent
+            if ply > 0 and tt_depth >= depth and beta - alpha == 1:
+                if tt_bound == EXACT:
+                    return tt_score, tt_move
+                if tt_bound == LOWER_BOUND and tt_score >= beta:
+                    return tt_score, tt_move
+                if tt_bound == UPPER_BOUND and tt_score <= alpha:
+                    return tt_score, tt_move
+ 
+        in_check = board.is_in_check(color)
+ 
+        # Null move: if passing still beats beta after a reduced search, a real move will too.
+        # Skipped in check, after another null move, and with only king and pawns (zugzwang risk)
+        if (self.null_move and allow_null and ply > 0 and depth >= NULL_MOVE_MIN_DEPTH and not in_check
+                and beta < MATE_THRESHOLD and board.has_non_pawn_material(color)):
+            static_score = board.evaluate() if color == 0 else -board.evaluate()
+            if static_score >= beta:
+                reduction = 3 if depth > 6 else 2
+                undo = board.make_null_move()
+                score = -self.negamax(board, depth - 1 - reduction, -beta, -beta + 1, ply + 1, False)[0]
+                board.unmake_null_move(undo)
+                if score >= beta:
+                    return (beta if score >= MATE_THRESHOLD else score), 0
+ 
+        if ply == 0 and self.root_moves is not None:
+            # The previous iteration already ordered the root moves, best first
+            moves = self.root_moves
+        else:
+            moves = board.legal_moves(color)
+            # No legal moves: checkmate (prefer the quickest mate) or stalemate
+            if not moves:
+                return (-MATE_SCORE + ply if in_check else 0), 0
+            moves = self.order_moves(board, moves, tt_move, ply)
+ 
+        best_score = -INFINITY
+        best_move = 0
+        squares = board.squares
+        killers = self.killers[ply]
+        reduce_late_moves = self.late_move_reductions and depth >= LMR_MIN_DEPTH and not in_check
+        for index, move in enumerate(moves):
+            quiet = squares[move >> 6 & 63] == EMPTY and not move >> 12
+            undo = board.make_move(move)
+            if index == 0:
+                score = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)[0]
+            else:
+                # Principal variation search: later moves only have to prove they are no better
+                # than alpha, which a null window does cheaply. Late quiet moves are also
+                # searched shallower (late move reductions) until they beat alpha
+                reduction = 0
+                if (reduce_late_moves and index >= LMR_MIN_MOVES and quiet and move not in killers
+                        and not board.is_in_check(board.side_to_move)):
+                    reduction = 2 if depth >= 6 and index >= 6 else 1
+                score = -self.negamax(board, depth - 1 - reduction, -alpha - 1, -alpha, ply + 1)[0]
+                if score > alpha and reduction:
+                    score = -self.negamax(board, depth - 1, -alpha - 1, -alpha, ply + 1)[0]
+                if alpha < score < beta:
+                    score = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)[0]
+            board.unmake_move(move, undo)
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    self.pv[ply] = (move,) + self.pv[ply + 1]
+                    if alpha >= beta:
+                        self.record_cutoff(board, move, depth, ply, index)
+                        break
+ 
+        if best_score <= alpha_orig:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.tt.store(board.hash_key, depth, score_to_tt(best_score, ply), bound, best_move)
+        return best_score, best_move
+
+    def quiescence(self, board, alpha, beta, ply):
+        """Capture-only search at the leaves, so no position is scored in the middle of an exchange"""
+        self.nodes += 1
+        if not self.nodes % TIME_CHECK_INTERVAL and self.out_of_budget():
+            raise SearchAborted
+        color = board.side_to_move
+        self.pv[ply] = ()
+        score = self.probe_tablebase(board, ply)
+        if score is not None:
+            return score
+        in_check = board.is_in_check(color)
+        stand_pat = board.evaluate()
+        if color:
+            stand_pat = -stand_pat
+        if ply >= MAX_PLY - 1:
+            return stand_pat
+        if in_check:
+            # Standing pat is no option in check: every evasion is searched, and none means mate
+            moves = board.legal_moves(color)
+            if not moves:
+                return -MATE_SCORE + ply
+            best_score = -INFINITY
+        else:
+            # Stand pat: the side to move can decline every capture and keep the static score
+            if stand_pat >= beta:
+                return stand_pat
+            if stand_pat > alpha:
+                alpha = stand_pat
+            best_score = stand_pat
+            moves = board.legal_moves(color, captures_only=True)
+        squares = board.squares
+        keyed = []
+        for move in moves:
+            victim = squares[move >> 6 & 63]
+            if victim == EMPTY:
+                keyed.append((0, move))
+                continue
+            if not in_check:
+                # Delta pruning: even winning the victim outright leaves us below alpha
+                if stand_pat + PIECE_VALUE_LIST[PIECE_KIND[victim]] + DELTA_MARGIN <= alpha:
+                    continue
+                if self.use_see and board.see(move) < 0:
+                    continue
+            keyed.append((CAPTURE_ORDER + MVV_LVA[PIECE_KIND[victim]][PIECE_KIND[squares[move & 63]]], move))
+        keyed.sort(reverse=True)
+        for _, move in keyed:
+            undo = board.make_move(move)
+            score = -self.quiescence(board, -beta, -alpha, ply + 1)
+            board.unmake_move(move, undo)
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best_score
+
+    def minimax(self, board, depth, alpha, beta, maximizing_player, ply=0):
+        """Search with scores from white's point of view; returns (score, ((row, col), (row, col)) or None).
+
+        maximizing_player must match the side to move on board.
+        """
+        alpha = max(alpha, -INFINITY)
+        beta = min(beta, INFINITY)
+        if maximizing_player:
+            score, move = self.negamax(board, depth, alpha, beta, ply)
+        else:
+            score, move = self.negamax(board, depth, -beta, -alpha, ply)
+            score = -score
+        return score, move_to_positions(move) if move else None
+
+    def search_root(self, position, depth, alpha=-INFINITY, beta=INFINITY):
+        """One iteration from the root, searching self.root_moves in order within (alpha, beta)"""
+        return self.negamax(position, depth, alpha, beta)
+
+    def aspiration_search(self, position, depth, previous_score):
+        """search_root in a narrow window around the previous iteration's score, widening on failure"""
+        if depth < ASPIRATION_MIN_DEPTH or abs(previous_score) > MATE_THRESHOLD:
+            return self.search_root(position, depth)
+        delta = ASPIRATION_WINDOW
+        alpha = previous_score - delta
+        beta = previous_score + delta
+        while True:
+            score, best = self.search_root(position, depth, alpha, beta)
+            if score <= alpha:
+                alpha = max(score - delta, -INFINITY)
+            elif score >= beta:
+                beta = min(score + delta, INFINITY)
+            else:
+                return score, best
+            delta *= 2
+
+    def iterative_deepening(self, board, time_limit, max_depth=MAX_SEARCH_DEPTH, on_iteration=None,
+                            max_nodes=None):
+        """Search depth 1, 2, ... until time_limit seconds pass or max_nodes are searched.
+
+        Returns (score, best_move, depth) from the deepest completed iteration,
+        with the score from white's point of view and best_move as a
+        ((row, col), (row, col)) pair, or None when the side to move has no
+        legal moves. Depth 1 always runs to completion unless the search is
+        stopped. on_iteration, if given, receives a SearchInfo after every
+        completed depth.
+        """
+        start_time = self.start_time = time.perf_counter()
+        self.time_limit = time_limit
+        self.tt.new_search()
+        self.nodes = 0
+        self.reset_ordering()
+        # Search a copy so an iteration abandoned mid-tree leaves the caller's board untouched
+        position = board.copy()
+        sign = 1 if position.side_to_move == 0 else -1
+        self.root_moves = self.order_moves(position, position.legal_moves(position.side_to_move), 0, 0)
+        self.principal_variation = []
+        result = (0, None, 0)
+        if not self.root_moves:
+            self.root_moves = None
+            return result
+        score = 0
+        try:
+            for depth in range(1, max_depth + 1):
+                if depth > 1:
+                    self.deadline = start_time + self.time_limit
+                    self.node_limit = max_nodes
+                try:
+                    score, best = self.aspiration_search(position, depth, score)
+                except SearchAborted:
+                    break
+                best_move = move_to_positions(best)
+                result = (sign * score, best_move, depth)
+                self.principal_variation = list(self.pv[0]) or [best]
+                elapsed = time.perf_counter() - start_time
+                if on_iteration:
+                    pv = [move_to_uci(move) for move in self.principal_variation]
+                    on_iteration(SearchInfo(depth, sign * score, best_move, self.nodes, elapsed, pv))
+                # Search the best move first next time; the rest keep their order
+                self.root_moves.remove(best)
+                self.root_moves.insert(0, best)
+                # Stop early on a forced mate, a single reply, or when the next iteration can't finish
+                if (self.stop_event.is_set() or abs(score) > MATE_THRESHOLD or len(self.root_moves) == 1
+                        or elapsed > self.time_limit / 2 or (max_nodes and self.nodes >= max_nodes)):
+                    break
+        finally:
+            self.deadline = None
+            self.node_limit = None
+            self.root_moves = None
+        return result
+
+def minimax(board, depth, alpha, beta, maximizing_player):
+    """Fixed-depth search; returns (score from white's view, best ((row, col), (row, col)) move)"""
+    default_transposition_table().new_search()
+    return Searcher().minimax(board, depth, alpha, beta, maximizing_player)
+
+def search_best_move(board, time_limit):
+    """Best move for the side to move found within time_limit seconds, or None"""
+    _, best_move, _ = Searcher().iterative_deepening(board, time_limit)
+    return best_move
+
+class SearchWorker:
+    """One AI move, searched by a SearchProcess so the UI thread never competes for the GIL.
+
+    The game loop calls poll() each frame: it returns ('progress', SearchInfo)
+    messages as iterations complete and finally ('done', best_move). cancel()
+    stops the search and discards anything it would still report. With an
+    opening book, a book move is answered straight away without searching.
+    """
+
+    def __init__(self, board, time_limit, process, book=None):
+        self.process = process
+        self.search_id = None
+        self.pending = []
+        book_move = book.choose_move(board) if book else None
+        if book_move is not None:
+            self.pending.append(('done', move_to_positions(book_move)))
+        else:
+            self.search_id = process.start(board, time_limit)
+
+    def poll(self):
+        messages, self.pending = self.pending, []
+        if self.search_id is not None:
+            messages += self.process.poll(self.search_id)
+            if any(kind == 'done' for kind, _ in messages):
+                self.search_id = None
+        return messages
+
+    def cancel(self):
+        if self.search_id is not None:
+            self.process.cancel(self.search_id)
+            self.search_id = None
+        self.pending = []
+
+def make_ai_move(board):
+    _, best_move = minimax(board, 3, float('-inf'), float('inf'), False)
+    if best_move:
+        start_pos, end_pos = best_move
+        board.move_piece(start_pos, end_pos)
+        return True
+    return False
+
+def choose_easy_ai_move(board):
+    """Pick a random legal move for black, or None if it has no moves"""
+    possible_moves = board.legal_moves(1)
+    if possible_moves:
+        return move_to_positions(random.choice(possible_moves))
+    return None
+
+def make_easy_ai_move(board):
+    """Make a simple move for easy AI mode with some randomness"""
+    move = choose_easy_ai_move(board)
+    if move:
+        board.move_piece(*move)
+        return True, move
+    return False, None
@@ -0,0 +1,232 @@
+"""Endgame tables for king and one piece against a bare king (KQK, KRK and KPK).
+
+Tables are generated by retrograde analysis, working backwards from every
+checkmate one ply at a time, and give the distance to mate for every
+position. Each table covers the stronger side as white, and only the
+positions with white's king on files a-d, since mirroring the board left to
+right changes nothing here. One table with the stronger side as black is
+enough too: the board is flipped before probing.
+
+Each entry holds 0 for a draw (or an impossible position) and otherwise
+plies to mate + 1. Which side is winning follows from the side to move,
+because only the stronger side can ever mate. Entries are bit-packed at the
+narrowest width that fits the table, and files are only read when a search
+first reaches that endgame.
+"""
+
+import os
+from array import array
+
+from .bitboard import (
+    BISHOP, KING_ATTACKS, KNIGHT, PAWN, PAWN_ATTACKS, QUEEN, ROOK, ROOK_RAYS, queen_attacks,
+    slider_attacks, squares_of
+)
+
+TABLEBASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tablebases')
+TABLE_NAMES = {QUEEN: 'KQK', ROOK: 'KRK', PAWN: 'KPK'}
+TABLE_ORDER = (QUEEN, ROOK, PAWN)  # KPK looks up KQK and KRK for its promotions
+TABLE_MAGIC = b'TBK1'
+FULL_SIZE = 2 * 64 * 64 * 64  # Side to move, strong king, weak king, piece
+STORED_SIZE = FULL_SIZE // 2  # Strong king on files a-d only
+
+def full_index(weak_to_move, strong_king, weak_king, piece):
+    return ((weak_to_move * 64 + strong_king) * 64 + weak_king) * 64 + piece
+
+def stored_index(weak_to_move, strong_king, weak_king, piece):
+    """Index into a stored table; strong_king must already be on files a-d"""
+    return ((weak_to_move * 32 + (strong_king >> 3) * 4 + (strong_king & 7)) * 64 + weak_king) * 64 + piece
+
+def _piece_attacks(kind, sq, occupied):
+    if kind == PAWN:
+        return PAWN_ATTACKS[0][sq]
+    if kind == ROOK:
+        return slider_attacks(sq, occupied, ROOK_RAYS)
+    return queen_attacks(sq, occupied)
+
+def _piece_squares(kind):
+    # White pawns never stand on the first or last rank
+    return range(8, 56) if kind == PAWN else range(64)
+
+def generate_table(kind, promotion_tables=None):
+    """Distance-to-mate values for every position of one table, indexed by full_index.
+
+    promotion_tables maps QUEEN and ROOK to their finished tables and is
+    needed for KPK, whose pawn can promote into them.
+    """
+    values = bytearray(FULL_SIZE)
+    remaining = bytearray(FULL_SIZE)  # Weak king moves not yet known to lose, per weak-to-move position
+    strong_legal = bytearray(FULL_SIZE)  # Strong-to-move positions where the weak king isn't in check
+    lost = []  # Weak-to-move positions lost at the current ply count
+    promotion_wins = {}  # Plies to mate -> strong-to-move positions winning by promoting
+    for strong_king in range(64):
+        for weak_king in range(64):
+            if weak_king == strong_king or KING_ATTACKS[strong_king] >> weak_king & 1:
+                continue
+            for piece in _piece_squares(kind):
+                if piece == strong_king or piece == weak_king:
+                    continue
+                occupied = (1 << strong_king) | (1 << weak_king) | (1 << piece)
+                if not _piece_attacks(kind, piece, occupied) >> weak_king & 1:
+                    strong_legal[full_index(0, strong_king, weak_king, piece)] = 1
+                    if kind == PAWN and piece >= 48 and not occupied >> (piece + 8) & 1:
+                        best = 0
+                        for promoted in (QUEEN, ROOK):
+                            value = promotion_tables[promoted][full_index(1, strong_king, weak_king, piece + 8)]
+                            if value and (not best or value < best):
+                                best = value
+                        if best:
+                            promotion_wins.setdefault(best, []).append(full_index(0, strong_king, weak_king, piece))
+                # Weak king moves: the piece's attacks are taken through the king it would be fleeing
+                guarded = KING_ATTACKS[strong_king] | _piece_attacks(kind, piece, occupied ^ (1 << weak_king))
+                targets = KING_ATTACKS[weak_king] & ~guarded & ~(1 << strong_king)
+                index = full_index(1, strong_king, weak_king, piece)
+                count = len(squares_of(targets))
+                remaining[index] = count
+                if not count and guarded >> weak_king & 1:
+                    values[index] = 1  # Checkmate
+                    lost.append(index)
+    plies = 0
+    while lost or any(depth > plies for depth in promotion_wins):
+        # Strong moves into a lost position win one ply later
+        won = []
+        for index in promotion_wins.pop(plies + 1, ()):
+            if not values[index]:
+                values[index] = plies + 2
+                won.append(index)
+        for index in lost:
+            piece = index & 63
+            weak_king = index >> 6 & 63
+            strong_king = index >> 12 & 63
+            occupied = (1 << strong_king) | (1 << weak_king) | (1 << piece)
+            for previous in squares_of(KING_ATTACKS[strong_king] & ~occupied & ~KING_ATTACKS[weak_king]):
+                before = full_index(0, previous, weak_king, piece)
+                if strong_legal[before] and not values[before]:
+                    values[before] = plies + 2
+                    won.append(before)
+            if kind == PAWN:
+                origins = []
+                if piece >= 16 and not occupied >> (piece - 8) & 1:
+                    origins.append(piece - 8)
+                    if 24 <= piece < 32 and not occupied >> (piece - 16) & 1:
+                        origins.append(piece - 16)
+            else:
+                # Sliding moves are reversible, so the piece came from a square it now attacks
+                origins = squares_of(_piece_attacks(kind, piece, occupied) & ~occupied)
+            for previous in origins:
+                before = full_index(0, strong_king, weak_king, previous)
+                if strong_legal[before] and not values[before]:
+                    values[before] = plies + 2
+                    won.append(before)
+        # A weak position is lost once every king move leads into a won one
+        lost = []
+        for index in won:
+            piece = index & 63
+            weak_king = index >> 6 & 63
+            strong_king = index >> 12 & 63
+            occupied = (1 << strong_king) | (1 << weak_king) | (1 << piece)
+            for previous in squares_of(KING_ATTACKS[weak_king] & ~occupied & ~KING_ATTACKS[strong_king]):
+                before = full_index(1, strong_king, previous, piece)
+                remaining[before] -= 1
+                if not remaining[before] and not values[before]:
+                    values[before] = plies + 3
+                    lost.append(before)
+        plies += 2
+    return values
+
+def pack_table(values):
+    """Bit-pack the file a-d half of a full table, returning (width, bytes)"""
+    stored = array('B', bytes(STORED_SIZE))
+    for weak_to_move in range(2):
+        for strong_king in range(64):
+            if strong_king & 7 >= 4:
+                continue
+            start = full_index(weak_to_move, strong_king, 0, 0)
+            target = stored_index(weak_to_move, strong_king, 0, 0)
+            stored[target:target + 4096] = array('B', values[start:start + 4096])
+    width = max(stored).bit_length() or 1
+    # Eight entries fill exactly `width` bytes, least significant bits first
+    packed = bytearray()
+    for start in range(0, STORED_SIZE, 8):
+        group = 0
+        for index in range(start + 7, start - 1, -1):
+            group = group << width | stored[index]
+        packed += group.to_bytes(width, 'little')
+    return width, bytes(packed)
+
+def write_table(path, kind, values):
+    width, data = pack_table(values)
+    with open(path, 'wb') as table_file:
+        table_file.write(TABLE_MAGIC + bytes((kind, width)) + data)
+
+def build_tables(directory=TABLEBASE_DIR):
+    """Generate and write every table, returning {name: (positions won, longest mate in plies)}"""
+    os.makedirs(directory, exist_ok=True)
+    tables = {}
+    summary = {}
+    for kind in TABLE_ORDER:
+        values = generate_table(kind, tables)
+        tables[kind] = values
+        write_table(os.path.join(directory, TABLE_NAMES[kind] + '.tb'), kind, values)
+        summary[TABLE_NAMES[kind]] = (sum(1 for value in values if value), max(values) - 1)
+    return summary
+
+class Tablebases:
+    """Lazily loaded tables, probed straight from the packed bytes"""
+
+    def __init__(self, directory=TABLEBASE_DIR):
+        self.directory = directory
+        self.tables = {}  # Piece type -> (width, data), or None when the file is missing
+
+    def _table(self, kind):
+        if kind not in self.tables:
+            path = os.path.join(self.directory, TABLE_NAMES[kind] + '.tb')
+            table = None
+            if os.path.exists(path):
+                with open(path, 'rb') as table_file:
+                    data = table_file.read()
+                if data[:4] == TABLE_MAGIC and data[4] == kind:
+                    table = (data[5], data[6:])
+            self.tables[kind] = table
+        return self.tables[kind]
+
+    def probe(self, board):
+        """(result, plies to mate) for the side to move, result being 1 win, 0 draw or -1 loss.
+
+        Returns None for positions the tables don't cover. The caller checks
+        first that exactly three pieces are on the board.
+        """
+        if board.castling_rights:
+            return None
+        strong = 0 if board.occupancy[0] & (board.occupancy[0] - 1) else 1
+        pieces = board.pieces[strong]
+        if pieces[KNIGHT] or pieces[BISHOP]:
+            return 0, 0  # A lone minor piece can't force mate
+        for kind in TABLE_ORDER:
+            if pieces[kind]:
+                break
+        else:
+            return None
+        table = self._table(kind)
+        if table is None:
+            return None
+        strong_king = board.king_squares[strong]
+        weak_king = board.king_squares[strong ^ 1]
+        piece = pieces[kind].bit_length() - 1
+        if strong:
+            # Look at the board from black's side so the stronger side plays up the board
+            strong_king ^= 56
+            weak_king ^= 56
+            piece ^= 56
+        if strong_king & 7 >= 4:
+            strong_king ^= 7
+            weak_king ^= 7
+            piece ^= 7
+        weak_to_move = int(board.side_to_move != strong)
+        width, data = table
+        bit = stored_index(weak_to_move, strong_king, weak_king, piece) * width
+        value = int.from_bytes(data[bit >> 3:(bit >> 3) + 2], 'little') >> (bit & 7) & ((1 << width) - 1)
+        if not value:
+            return 0, 0
+        return (-1 if weak_to_move else 1), value - 1
+
+tablebases = Tablebases()
@@ -0,0 +1,262 @@
+"""Headless self-play matches between two engine configurations over a process pool.
+
+Each opening (a few random plies from the start position, or a book line)
+is played twice with colors swapped, so neither side profits from a lucky
+opening. Results are reported as an Elo difference with a 95% error bar,
+with optional SPRT early stopping, along with games and nodes per second.
+
+    python -m engine match --games 2000 --tc 10+0.1 --a null_move=on --b null_move=off --sprt 0 5
+"""
+
+import argparse
+import math
+import multiprocessing
+import random
+import time
+from collections import namedtuple
+
+from .bitboard import BISHOP, KNIGHT, PAWN, QUEEN, ROOK
+from .book import OpeningBook
+from .parallel import SEARCH_WORKERS
+from .position import START_FEN, Position
+from .search import MAX_SEARCH_DEPTH, Searcher, TranspositionTable
+from .uci import allocate_time
+
+MATCH_HASH_MB = 4  # Each player in each game gets its own table of this size
+OPENING_PLIES = 8  # Random plies played before the engines take over
+MAX_GAME_PLIES = 400  # Games still going after this many plies are scored as draws
+Z_95 = 1.959964  # Two-sided 95% normal quantile
+
+# One side's settings: search limits plus Searcher attributes such as null_move
+PlayerConfig = namedtuple('PlayerConfig', ['name', 'depth', 'nodes', 'movetime', 'options'])
+GameResult = namedtuple('GameResult', ['pair', 'a_white', 'score', 'nodes', 'plies', 'reason'])
+
+SEARCHER_OPTIONS = ('null_move', 'late_move_reductions', 'use_see')
+
+def parse_player(spec, name):
+    """PlayerConfig from 'depth=6,nodes=20000,movetime=0.1,null_move=off,name=...'"""
+    settings = dict(item.split('=', 1) for item in spec.split(',') if item)
+    options = {}
+    for key in SEARCHER_OPTIONS:
+        if key in settings:
+            options[key] = settings.pop(key).lower() in ('1', 'on', 'true', 'yes')
+    config = PlayerConfig(settings.pop('name', name), int(settings['depth']) if 'depth' in settings else None,
+                          int(settings['nodes']) if 'nodes' in settings else None,
+                          float(settings['movetime']) if 'movetime' in settings else None, options)
+    for key in ('depth', 'nodes', 'movetime'):
+        settings.pop(key, None)
+    if settings:
+        raise ValueError('unknown player settings: ' + ', '.join(settings))
+    return config
+
+def has_search_limit(config):
+    """Whether a player stops searching on its own, without a clock to stop it"""
+    return config.depth is not None or config.nodes is not None or config.movetime is not None
+
+def random_moves(board, rng, plies):
+    """Play up to `plies` random legal moves on board, returning them"""
+    moves = []
+    for _ in range(plies):
+        legal = board.legal_moves(board.side_to_move)
+        if not legal:
+            break
+        move = rng.choice(legal)
+        board.make_move(move)
+        moves.append(move)
+    return moves
+
+def random_opening(rng, plies=OPENING_PLIES):
+    """Moves reached by random legal play from the start, avoiding lines that already ended"""
+    while True:
+        board = Position.from_fen(START_FEN)
+        moves = random_moves(board, rng, plies)
+        if len(moves) == plies and board.legal_moves(board.side_to_move):
+            return moves
+
+def book_opening(book, rng, plies=OPENING_PLIES):
+    """Moves drawn from an opening book, topped up with random moves once out of book"""
+    board = Position.from_fen(START_FEN)
+    moves = []
+    while len(moves) < plies:
+        move = book.choose_move(board, rng)
+        if move is None:
+            break
+        board.make_move(move)
+        moves.append(move)
+    return moves + random_moves(board, rng, plies - len(moves))
+
+def insufficient_material(board):
+    """Neither side can mate: bare kings, or a single knight or bishop left"""
+    for color in range(2):
+        pieces = board.pieces[color]
+        if pieces[PAWN] | pieces[ROOK] | pieces[QUEEN]:
+            return False
+    minors = [bin(board.pieces[color][KNIGHT] | board.pieces[color][BISHOP]).count('1') for color in range(2)]
+    return sum(minors) <= 1
+
+def play_game(task):
+    """Play one game; task is (pair, a_white, player_a, player_b, opening, base, increment)"""
+    pair, a_white, player_a, player_b, opening, base, increment = task
+    players = (player_a, player_b) if a_white else (player_b, player_a)
+    searchers = []
+    for config in players:
+        searcher = Searcher(TranspositionTable(MATCH_HASH_MB))
+        for key, value in config.options.items():
+            setattr(searcher, key, value)
+        searchers.append(searcher)
+    board = Position.from_fen(START_FEN)
+    for move in opening:
+        board.make_move(move)
+    clocks = [base, base]
+    seen = {board.hash_key: 1}
+    nodes = 0
+    score, reason = 0.5, 'move limit'  # From white's point of view
+    for ply in range(len(opening), MAX_GAME_PLIES):
+        color = board.side_to_move
+        if not board.legal_moves(color):
+            if board.is_in_check(color):
+                score, reason = (0.0 if color == 0 else 1.0), 'checkmate'
+            else:
+                reason = 'stalemate'
+            break
+        if board.halfmove_clock >= 100:
+            reason = 'fifty moves'
+            break
+        if seen[board.hash_key] >= 3:
+            reason = 'repetition'
+            break
+        if insufficient_material(board):
+            reason = 'insufficient material'
+            break
+        config = players[color]
+        if config.movetime is not None:
+            time_limit = config.movetime
+        elif base:
+            time_limit = allocate_time(clocks[color], increment)
+        else:
+            time_limit = float('inf')
+        searcher = searchers[color]
+        start = time.perf_counter()
+        searcher.iterative_deepening(board, time_limit, config.depth or MAX_SEARCH_DEPTH, max_nodes=config.nodes)
+        if base and config.movetime is None:
+            clocks[color] += increment - (time.perf_counter() - start)
+            if clocks[color] < 0:
+                score, reason = (0.0 if color == 0 else 1.0), 'time forfeit'
+                break
+        nodes += searcher.nodes
+        board.make_move(searcher.principal_variation[0])
+        seen[board.hash_key] = seen.get(board.hash_key, 0) + 1
+    return GameResult(pair, a_white, score if a_white else 1.0 - score, nodes, ply, reason)
+
+def elo_from_score(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+def elo_estimate(wins, draws, losses):
+    """(Elo difference, 95% error margin) from A's wins, draws and losses"""
+    games = wins + draws + losses
+    if not games:
+        return 0.0, float('inf')
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    if not variance:
+        return elo_from_score(score), float('inf')  # All results alike: no basis for an error bar yet
+    margin = Z_95 * math.sqrt(variance / games)
+    low, high = elo_from_score(score - margin), elo_from_score(score + margin)
+    return elo_from_score(score), (high - low) / 2
+
+def sprt_llr(wins, draws, losses, elo0, elo1):
+    """Log-likelihood ratio of H1 (elo1) over H0 (elo0), in the usual normal approximation"""
+    games = wins + draws + losses
+    if not games:
+        return 0.0
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    if variance <= 0:
+        return 0.0
+    score0 = 1 / (1 + 10 ** (-elo0 / 400))
+    score1 = 1 / (1 + 10 ** (-elo1 / 400))
+    return games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+
+def sprt_bounds(alpha=0.05, beta=0.05):
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+def run_match(player_a, player_b, games, base=10.0, increment=0.1, workers=SEARCH_WORKERS, seed=None,
+              book_path=None, sprt=None, report_every=20, output=print):
+    """Play up to `games` games (rounded up to whole pairs) and return (wins, draws, losses) for A.
+
+    sprt, if given, is (elo0, elo1, alpha, beta); the match stops as soon as
+    the log-likelihood ratio crosses either bound.
+    """
+    if not base and not (has_search_limit(player_a) and has_search_limit(player_b)):
+        raise ValueError('without a clock every player needs a depth, nodes or movetime limit')
+    rng = random.Random(seed)
+    book = OpeningBook(book_path) if book_path else None
+    tasks = []
+    for pair in range((games + 1) // 2):
+        opening = book_opening(book, rng) if book else random_opening(rng)
+        for a_white in (True, False):
+            tasks.append((pair, a_white, player_a, player_b, opening, base, increment))
+    if book:
+        book.close()
+    wins = draws = losses = 0
+    nodes = 0
+    reasons = {}
+    bounds = sprt_bounds(*sprt[2:]) if sprt else None
+    llr = 0.0
+    start = time.perf_counter()
+    pool = multiprocessing.get_context().Pool(workers)
+    try:
+        for result in pool.imap_unordered(play_game, tasks):
+            if result.score == 1.0:
+                wins += 1
+            elif result.score == 0.0:
+                losses += 1
+            else:
+                draws += 1
+            nodes += result.nodes
+            reasons[result.reason] = reasons.get(result.reason, 0) + 1
+            played = wins + draws + losses
+            llr = sprt_llr(wins, draws, losses, sprt[0], sprt[1]) if sprt else None
+            finished = played == len(tasks) or (sprt and not bounds[0] < llr < bounds[1])
+            if finished or played % report_every == 0:
+                elapsed = time.perf_counter() - start
+                elo, margin = elo_estimate(wins, draws, losses)
+                line = (f"{played:6d} games  +{wins} ={draws} -{losses}  Elo {elo:+.1f} +/- {margin:.1f}  "
+                        f"{played / elapsed:.2f} games/s  {nodes / elapsed:,.0f} nodes/s")
+                if sprt:
+                    line += f"  LLR {llr:+.2f} [{bounds[0]:.2f}, {bounds[1]:.2f}]"
+                output(line)
+            if finished:
+                break
+    finally:
+        pool.terminate()
+    if sprt and not bounds[0] < llr < bounds[1]:
+        output(f"SPRT: {'H1' if llr >= bounds[1] else 'H0'} accepted")
+    output('Terminations: ' + ', '.join(f"{reason} {count}" for reason, count in sorted(reasons.items())))
+    return wins, draws, losses
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m engine match', description=__doc__.split('\n')[0])
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--tc', default='10+0.1', help='base+increment in seconds, or 0 for depth/node limits only')
+    parser.add_argument('--a', default='', help="player A settings, e.g. 'depth=5,null_move=off'")
+    parser.add_argument('--b', default='', help='player B settings')
+    parser.add_argument('--workers', type=int, default=SEARCH_WORKERS)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--book', help='opening book to draw openings from')
+    parser.add_argument('--sprt', type=float, nargs=2, metavar=('ELO0', 'ELO1'))
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--beta', type=float, default=0.05)
+    args = parser.parse_args(argv)
+    base, _, increment = args.tc.partition('+')
+    player_a = parse_player(args.a, 'A')
+    player_b = parse_player(args.b, 'B')
+    if not float(base) and not (has_search_limit(player_a) and has_search_limit(player_b)):
+        parser.error('--tc 0 needs depth=, nodes= or movetime= in both --a and --b')
+    print(f"{player_a.name}: {args.a or 'defaults'}  vs  {player_b.name}: {args.b or 'defaults'}  "
+          f"tc {args.tc}, {args.workers} workers")
+    sprt = (args.sprt[0], args.sprt[1], args.alpha, args.beta) if args.sprt else None
+    run_match(player_a, player_b, args.games, float(base), float(increment or 0), args.workers, args.seed,
+              args.book, sprt)
+    return 0
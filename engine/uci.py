@@ -0,0 +1,262 @@
+"""Universal Chess Interface front end, so GUIs and tournament managers can drive the engine.
+
+Commands are read on the calling thread while searches run on a background
+thread, so `stop` and `ponderhit` take effect at the search's next clock
+check. Run it with `python -m engine uci`.
+"""
+
+import os
+import sys
+import threading
+import time
+
+from .bitboard import BOARD_SIZE
+from .book import OpeningBook
+from .parallel import ParallelSearcher
+from .position import START_FEN, Position, move_from_uci, move_to_uci
+from .search import MATE_SCORE, MATE_THRESHOLD, MAX_SEARCH_DEPTH, TT_SIZE_MB, Searcher, TranspositionTable
+
+ENGINE_NAME = 'Pygame Chess'
+ENGINE_AUTHOR = 'Pygame Chess developers'
+MAX_HASH_MB = 4096
+MAX_THREADS = os.cpu_count() or 1
+
+# Time management
+DEFAULT_MOVES_TO_GO = 30  # Moves the remaining clock is shared across when the GUI doesn't say
+INCREMENT_SHARE = 0.75  # Part of the increment spent on the current move
+MOVE_OVERHEAD = 0.05  # Seconds kept back per move for GUI and pipe latency
+MIN_MOVE_TIME = 0.01
+
+def allocate_time(time_left, increment=0.0, moves_to_go=None):
+    """Seconds to spend on one move: an even share of the clock plus most of the increment"""
+    budget = time_left / (moves_to_go or DEFAULT_MOVES_TO_GO) + increment * INCREMENT_SHARE
+    return max(MIN_MOVE_TIME, min(budget, time_left / 2) - MOVE_OVERHEAD)
+
+def format_score(score):
+    """UCI score text for a score from the side to move's point of view"""
+    if abs(score) > MATE_THRESHOLD:
+        plies = MATE_SCORE - abs(score)
+        return 'mate %d' % ((plies + 1) // 2 if score > 0 else -((plies + 1) // 2))
+    return 'cp %d' % score
+
+class UciEngine:
+    """UCI session state: the current position, options and the search running in the background"""
+
+    def __init__(self, output=None):
+        self.output = output or self._write
+        self.output_lock = threading.Lock()
+        self.board = Position.from_fen(START_FEN)
+        self.tt = TranspositionTable(TT_SIZE_MB)
+        self.threads = 1
+        self.searcher = Searcher(self.tt)
+        self.search_thread = None
+        self.book = None
+        # Set by stop or ponderhit; a finished infinite or ponder search waits for it before answering
+        self.release = threading.Event()
+        self.pondering = False
+        self.ponder_time_limit = None  # Budget that takes over when the ponder move is played
+
+    @staticmethod
+    def _write(text):
+        sys.stdout.write(text + '\n')
+        sys.stdout.flush()
+
+    def send(self, text):
+        with self.output_lock:
+            self.output(text)
+
+    def run(self, stream=None):
+        """Handle commands from stream (stdin by default) until `quit` or end of input"""
+        for line in stream or sys.stdin:
+            if not self.handle(line):
+                break
+        self.quit()
+        return 0
+
+    def handle(self, line):
+        """Process one command line; returns False once the session should end.
+
+        A malformed command is reported as an info string and otherwise
+        ignored, so a bad line from the GUI never takes the engine down.
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        try:
+            return self.dispatch(tokens[0], tokens[1:])
+        except (ValueError, IndexError, KeyError) as error:
+            self.send('info string ignoring malformed command %r: %s' % (line.strip(), error))
+            return True
+
+    def dispatch(self, command, args):
+        if command == 'uci':
+            self.send('id name ' + ENGINE_NAME)
+            self.send('id author ' + ENGINE_AUTHOR)
+            self.send('option name Hash type spin default %d min 1 max %d' % (TT_SIZE_MB, MAX_HASH_MB))
+            self.send('option name Threads type spin default 1 min 1 max %d' % MAX_THREADS)
+            self.send('option name Ponder type check default false')
+            self.send('option name BookFile type string default <empty>')
+            self.send('uciok')
+        elif command == 'isready':
+            self.send('readyok')
+        elif command == 'setoption':
+            self.set_option(args)
+        elif command == 'ucinewgame':
+            self.stop_search()
+            self.tt.clear()
+            if self.threads > 1:
+                self.new_searcher()  # Fresh workers, so their tables start empty too
+        elif command == 'position':
+            self.stop_search()
+            self.set_position(args)
+        elif command == 'go':
+            self.go(args)
+        elif command == 'stop':
+            self.stop_search()
+        elif command == 'ponderhit':
+            self.ponder_hit()
+        elif command == 'quit':
+            return False
+        return True
+
+    def set_option(self, args):
+        # setoption name <id> [value <x>]; option names may contain spaces
+        text = ' '.join(args)
+        name, _, value = text.partition(' value ')
+        name = name.replace('name ', '', 1).strip().lower()
+        self.stop_search()
+        if name == 'hash':
+            self.tt.resize(max(1, min(int(value), MAX_HASH_MB)))
+            if self.threads > 1:
+                self.new_searcher()  # Workers size their tables from self.tt when they start
+        elif name == 'threads':
+            threads = max(1, min(int(value), MAX_THREADS))
+            if threads != self.threads:
+                self.threads = threads
+                self.new_searcher()
+        elif name == 'bookfile':
+            if self.book:
+                self.book.close()
+            self.book = OpeningBook(value.strip()) if value.strip() not in ('', '<empty>') else None
+
+    def set_position(self, args):
+        if not args:
+            return
+        if args[0] == 'startpos':
+            fen, rest = START_FEN, args[1:]
+        elif args[0] == 'fen':
+            end = args.index('moves') if 'moves' in args else len(args)
+            fen, rest = ' '.join(args[1:end]), args[end:]
+        else:
+            return
+        board = Position.from_fen(fen)
+        if len(fen.split()[0].split('/')) != BOARD_SIZE or None in board.king_squares \
+                or board.is_in_check(board.side_to_move ^ 1):
+            raise ValueError('impossible position ' + fen)
+        for text in rest[1:] if rest[:1] == ['moves'] else []:
+            move = move_from_uci(text)
+            if move not in board.legal_moves(board.side_to_move):
+                raise ValueError('illegal move ' + text)
+            board.make_move(move)
+        self.board = board
+
+    def go(self, args):
+        self.stop_search()
+        params = {}
+        flags = set()
+        index = 0
+        while index < len(args):
+            if args[index] in ('infinite', 'ponder'):
+                flags.add(args[index])
+                index += 1
+            elif args[index] == 'searchmoves':
+                break  # Not supported; search every move
+            else:
+                params[args[index]] = int(args[index + 1])
+                index += 2
+        white = self.board.side_to_move == 0
+        time_left = params.get('wtime' if white else 'btime')
+        if 'movetime' in params:
+            time_limit = max(MIN_MOVE_TIME, params['movetime'] / 1000 - MOVE_OVERHEAD)
+        elif time_left is not None:
+            time_limit = allocate_time(time_left / 1000, params.get('winc' if white else 'binc', 0) / 1000,
+                                       params.get('movestogo'))
+        else:
+            time_limit = float('inf')
+        self.pondering = 'ponder' in flags
+        if self.pondering:
+            # Think on the opponent's time until ponderhit says how long we really have
+            self.ponder_time_limit = time_limit
+            time_limit = float('inf')
+        wait = self.pondering or 'infinite' in flags
+        book_move = self.book.choose_move(self.board) if self.book and not wait else None
+        if book_move is not None:
+            self.send('bestmove ' + move_to_uci(book_move))
+            return
+        self.release.clear()
+        self.searcher.stop_event.clear()
+        self.search_thread = threading.Thread(
+            target=self._search, daemon=True,
+            args=(self.board.copy(), time_limit, params.get('depth', MAX_SEARCH_DEPTH), params.get('nodes'), wait))
+        self.search_thread.start()
+
+    def _search(self, board, time_limit, depth, nodes, wait):
+        sign = 1 if board.side_to_move == 0 else -1
+
+        def report(info):
+            nps = int(info.nodes / info.elapsed) if info.elapsed > 0 else 0
+            self.send('info depth %d score %s nodes %d nps %d time %d pv %s' % (
+                info.depth, format_score(sign * info.score), info.nodes, nps, int(info.elapsed * 1000),
+                ' '.join(info.pv)))
+
+        self.searcher.iterative_deepening(board, time_limit, depth, on_iteration=report, max_nodes=nodes)
+        pv = self.searcher.principal_variation
+        # UCI forbids answering an infinite or ponder search before stop or ponderhit
+        if wait:
+            self.release.wait()
+        if not pv:
+            self.send('bestmove 0000')
+        elif len(pv) > 1:
+            self.send('bestmove %s ponder %s' % (move_to_uci(pv[0]), move_to_uci(pv[1])))
+        else:
+            self.send('bestmove ' + move_to_uci(pv[0]))
+
+    def ponder_hit(self):
+        """The opponent played the move we were pondering on: keep searching, now against the clock"""
+        if not self.pondering:
+            return
+        self.pondering = False
+        elapsed = time.perf_counter() - self.searcher.start_time
+        self.searcher.set_time_limit(elapsed + self.ponder_time_limit)
+        self.release.set()
+
+    def stop_search(self):
+        """Stop any running search and wait until it has sent its bestmove"""
+        if self.search_thread is None:
+            return
+        self.pondering = False
+        self.release.set()
+        self.searcher.stop()
+        self.search_thread.join()
+        self.search_thread = None
+
+    def new_searcher(self):
+        """Replace the searcher with one for the current Threads setting, sharing self.tt"""
+        self.close_searcher()
+        self.searcher = Searcher(self.tt) if self.threads == 1 else ParallelSearcher(self.threads, self.tt)
+
+    def close_searcher(self):
+        if isinstance(self.searcher, ParallelSearcher):
+            self.searcher.close()
+
+    def quit(self):
+        self.stop_search()
+        self.close_searcher()
+        if self.book:
+            self.book.close()
+
+def main():
+    return UciEngine().run()
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,21 +1,29 @@
 import pygame
+import functools
+import multiprocessing
+import os
 import sys
-import random
-import time
- 
-# Initialize Pygame
-pygame.init()
+
+from engine import (
+    BOARD_SIZE, SEARCH_WORKERS, OpeningBook, SearchProcess, SearchWorker, choose_easy_ai_move,
+    create_board, get_game_status, get_valid_moves
+)
  
 # Constants
 WINDOW_SIZE = 680
-BOARD_SIZE = 8
 SQUARE_SIZE = (WINDOW_SIZE - 100) // BOARD_SIZE  # Reduced square size to make room for player names
 BOARD_OFFSET_Y = 50  # Space for player names at top and bottom
+BOARD_OFFSET_X = (WINDOW_SIZE - BOARD_SIZE * SQUARE_SIZE) // 2
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 HIGHLIGHT = (255, 255, 0, 128)
 VALID_MOVE = (0, 255, 0, 128)
-FPS = 144  # Increased FPS for smoother gameplay
+FPS = 144  # Frame rate cap while something is animating or the AI is searching
+IDLE_TIMEOUT_MS = 500  # Longest an idle screen sleeps waiting for input
+UI_FONT = 'Arial'
+TEXT_CACHE_SIZE = 256  # Rendered text surfaces kept for reuse, least recently used dropped first
+# Opening book for the medium and hard AIs, used when present (build one with `python -m engine book build`)
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'book.bin')
  
 # Colors for the board
 LIGHT_SQUARE = (240, 217, 181)
@@ -42,10 +50,6 @@ MENU_BORDER_COLOR = (100, 100, 110)  # Border color
 MENU_MARGIN = 40  # Margin from screen edges
 MENU_PADDING = 20  # Padding between elements
  
-# Set up the display
-screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
-pygame.display.set_caption("Chess Game with AI")
- 
 # Chess piece Unicode characters
 PIECES = {
     'white': {
@@ -66,21 +70,21 @@ PIECES = {
     }
 }
  
-# Piece values for evaluation
-PIECE_VALUES = {
-    'pawn': 100,
-    'knight': 320,
-    'bishop': 330,
-    'rook': 500,
-    'queen': 900,
-    'king': 20000
-}
- 
 # Menu settings
 BLUE = (0, 0, 255)
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
  
+@functools.lru_cache(maxsize=None)
+def get_font(size, bold=False, family=UI_FONT):
+    """Shared font for (family, size, bold); SysFont lookups are slow, so each is resolved once"""
+    return pygame.font.SysFont(family, size, bold=bold)
+ 
+@functools.lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text(text, size, color, bold=False, family=UI_FONT):
+    """Antialiased text surface, rendered once and reused while it stays in the cache"""
+    return get_font(size, bold, family).render(text, True, color).convert_alpha()
+ 
 class Button:
     def __init__(self, x, y, width, height, text, color):
         self.rect = pygame.Rect(x, y, width, height)
@@ -92,10 +96,16 @@ class Button:
         self.animation_speed = 0.2
         self.target_offset = 0
  
+    @property
+    def animating(self):
+        return self.animation_offset != self.target_offset
+ 
     def draw(self, surface):
-        # Animate button position
-        if self.animation_offset != self.target_offset:
+        # Animate button position, snapping the last fraction of a pixel so the animation ends
+        if self.animating:
             self.animation_offset += (self.target_offset - self.animation_offset) * self.animation_speed
+            if abs(self.target_offset - self.animation_offset) < 0.5:
+                self.animation_offset = self.target_offset
        
         # Create animated rect
         animated_rect = self.rect.copy()
@@ -118,13 +128,12 @@ class Button:
         pygame.draw.rect(surface, border_color, animated_rect, 2)
        
         # Draw text with shadow
-        font = pygame.font.SysFont('Arial', 32, bold=True)
         # Shadow
-        shadow = font.render(self.text, True, (0, 0, 0))
+        shadow = render_text(self.text, 32, (0, 0, 0), bold=True)
         shadow_rect = shadow.get_rect(center=(animated_rect.centerx + 2, animated_rect.centery + 2))
         surface.blit(shadow, shadow_rect)
         # Main text
-        text_surface = font.render(self.text, True, MENU_TEXT_COLOR)
+        text_surface = render_text(self.text, 32, MENU_TEXT_COLOR, bold=True)
         text_rect = text_surface.get_rect(center=animated_rect.center)
         surface.blit(text_surface, text_rect)
  
@@ -138,8 +147,6 @@ class TextInput:
         self.color = MENU_BUTTON_BG
         self.border_color = MENU_BORDER_COLOR
         self.text_color = MENU_TEXT_COLOR
-        self.font = pygame.font.SysFont('Arial', 32)
-        self.label_font = pygame.font.SysFont('Arial', 24)
         self.first_click = True
         
     def handle_event(self, event):
@@ -169,7 +176,7 @@ class TextInput:
                 
     def draw(self, surface):
         # Draw label
-        label_surface = self.label_font.render(self.label, True, MENU_TEXT_COLOR)
+        label_surface = render_text(self.label, 24, MENU_TEXT_COLOR)
         label_rect = label_surface.get_rect(bottomleft=(self.rect.left, self.rect.top - 5))
         surface.blit(label_surface, label_rect)
         
@@ -180,10 +187,25 @@ class TextInput:
         
         # Draw text
         text_color = MENU_TEXT_COLOR if not (self.first_click and self.text == self.default_text) else (128, 128, 128)
-        text_surface = self.font.render(self.text, True, text_color)
+        text_surface = render_text(self.text, 32, text_color)
         text_rect = text_surface.get_rect(center=self.rect.center)
         surface.blit(text_surface, text_rect)
 
+def wait_for_events(clock, busy):
+    """The events for the next frame.
+ 
+    While busy (animating or searching) frames run at up to FPS; otherwise
+    this sleeps in pygame.event.wait until input arrives or IDLE_TIMEOUT_MS
+    passes, so an idle window costs next to no CPU.
+    """
+    if busy:
+        clock.tick(FPS)
+        return pygame.event.get()
+    event = pygame.event.wait(IDLE_TIMEOUT_MS)
+    clock.tick()
+    events = [] if event.type == pygame.NOEVENT else [event]
+    return events + pygame.event.get()
+ 
 def draw_menu():
     screen.fill(MENU_BG)
    
@@ -194,14 +216,13 @@ def draw_menu():
         pygame.draw.line(screen, (35, 35, 45), (MENU_MARGIN, i), (WINDOW_SIZE - MENU_MARGIN, i))
    
     # Draw title with enhanced shadow effect and proper margin
-    font_title = pygame.font.SysFont('Arial', 72, bold=True)
     # Multiple shadow layers for depth
+    shadow = render_text("Chess Game", 72, (0, 0, 0), bold=True)
     for offset in range(3, 0, -1):
-        shadow = font_title.render("Chess Game", True, (0, 0, 0))
         shadow_rect = shadow.get_rect(center=(WINDOW_SIZE // 2 + offset, MENU_MARGIN + 102 + offset))
         screen.blit(shadow, shadow_rect)
     # Main text with gradient effect
-    title = font_title.render("Chess Game", True, MENU_TITLE_COLOR)
+    title = render_text("Chess Game", 72, MENU_TITLE_COLOR, bold=True)
     title_rect = title.get_rect(center=(WINDOW_SIZE // 2, MENU_MARGIN + 100))
     screen.blit(title, title_rect)
    
@@ -284,12 +305,11 @@ def menu_loop():
        
         if current_page == "main":
             # Draw title
-            font_title = pygame.font.SysFont('Arial', 72, bold=True)
+            shadow = render_text("Chess Game", 72, (0, 0, 0), bold=True)
             for offset in range(3, 0, -1):
-                shadow = font_title.render("Chess Game", True, (0, 0, 0))
                 shadow_rect = shadow.get_rect(center=(WINDOW_SIZE // 2 + offset, MENU_MARGIN + 102 + offset))
                 screen.blit(shadow, shadow_rect)
-            title = font_title.render("Chess Game", True, MENU_TITLE_COLOR)
+            title = render_text("Chess Game", 72, MENU_TITLE_COLOR, bold=True)
             title_rect = title.get_rect(center=(WINDOW_SIZE // 2, MENU_MARGIN + 100))
             screen.blit(title, title_rect)
            
@@ -302,8 +322,7 @@ def menu_loop():
             back_button.draw(screen)
             
             # Draw title
-            font_title = pygame.font.SysFont('Arial', 48, bold=True)
-            title = font_title.render("Enter Player Names", True, MENU_TITLE_COLOR)
+            title = render_text("Enter Player Names", 48, MENU_TITLE_COLOR, bold=True)
             title_rect = title.get_rect(center=(WINDOW_SIZE // 2, MENU_MARGIN + 50))
             screen.blit(title, title_rect)
             
@@ -321,8 +340,7 @@ def menu_loop():
             back_button.draw(screen)
             
             # Draw difficulty selection title
-            font_title = pygame.font.SysFont('Arial', 48, bold=True)
-            title = font_title.render("Select Difficulty:", True, MENU_TITLE_COLOR)
+            title = render_text("Select Difficulty:", 48, MENU_TITLE_COLOR, bold=True)
             title_rect = title.get_rect(center=(WINDOW_SIZE // 2, MENU_MARGIN + 50))
             screen.blit(title, title_rect)
             
@@ -337,8 +355,9 @@ def menu_loop():
                 start_button.draw(screen)
        
         pygame.display.flip()
+        busy = any(button.animating for button in buttons + difficulty_buttons + [back_button])
        
-        for event in pygame.event.get():
+        for event in wait_for_events(clock, busy):
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -409,295 +428,149 @@ def menu_loop():
                         button.hover = button.rect.collidepoint(mouse_pos)
                     if ai_difficulty:
                         start_button.hover = start_button.rect.collidepoint(mouse_pos)
-       
-        clock.tick(FPS)
- 
-# Game logic functions
-def get_raw_moves(board, start_pos, piece):
-    """Get moves without considering check (to avoid recursion)"""
-    valid_moves = []
-    row, col = start_pos
-    piece_type = piece[1]
-    piece_color = piece[0]
-    direction = 1 if piece_color == 'white' else -1
- 
-    if piece_type == 'pawn':
-        # Forward move
-        new_row = row + direction
-        if 0 <= new_row < BOARD_SIZE:
-            if not board[new_row][col]:
-                valid_moves.append((new_row, col))
-                if (piece_color == 'white' and row == 1) or (piece_color == 'black' and row == 6):
-                    new_row = row + 2 * direction
-                    if 0 <= new_row < BOARD_SIZE and not board[new_row][col]:
-                        valid_moves.append((new_row, col))
-       
-        # Diagonal captures
-        for dcol in [-1, 1]:
-            new_col = col + dcol
-            new_row = row + direction
-            if 0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE:
-                target = board[new_row][new_col]
-                if target and target[0] != piece_color:
-                    valid_moves.append((new_row, new_col))
- 
-    elif piece_type in ['rook', 'bishop', 'queen']:
-        directions = []
-        if piece_type in ['rook', 'queen']:
-            directions.extend([(0, 1), (0, -1), (1, 0), (-1, 0)])
-        if piece_type in ['bishop', 'queen']:
-            directions.extend([(1, 1), (1, -1), (-1, 1), (-1, -1)])
-           
-        for drow, dcol in directions:
-            new_row, new_col = row + drow, col + dcol
-            while 0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE:
-                target = board[new_row][new_col]
-                if not target:
-                    valid_moves.append((new_row, new_col))
-                else:
-                    if target[0] != piece_color:
-                        valid_moves.append((new_row, new_col))
-                    break
-                new_row += drow
-                new_col += dcol
- 
-    elif piece_type == 'knight':
-        moves = [
-            (row + 2, col + 1), (row + 2, col - 1),
-            (row - 2, col + 1), (row - 2, col - 1),
-            (row + 1, col + 2), (row + 1, col - 2),
-            (row - 1, col + 2), (row - 1, col - 2)
-        ]
-        for new_row, new_col in moves:
-            if 0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE:
-                target = board[new_row][new_col]
-                if not target or target[0] != piece_color:
-                    valid_moves.append((new_row, new_col))
- 
-    elif piece_type == 'king':
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
-        for drow, dcol in directions:
-            new_row, new_col = row + drow, col + dcol
-            if 0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE:
-                target = board[new_row][new_col]
-                if not target or target[0] != piece_color:
-                    valid_moves.append((new_row, new_col))
- 
-    return valid_moves
- 
-def get_valid_moves(board, start_pos, piece):
-    valid_moves = []
-    raw_moves = get_raw_moves(board, start_pos, piece)
-   
-    # Test each move to ensure it doesn't leave or put the king in check
-    for move in raw_moves:
-        temp_board = [row[:] for row in board]
-        temp_board[move[0]][move[1]] = piece
-        temp_board[start_pos[0]][start_pos[1]] = ''
-       
-        if not is_in_check(temp_board, piece[0]):
-            valid_moves.append(move)
-   
-    return valid_moves
- 
-def evaluate_board(board):
-    score = 0
-    for row in range(BOARD_SIZE):
-        for col in range(BOARD_SIZE):
-            piece = board[row][col]
-            if piece:
-                value = PIECE_VALUES[piece[1]]
-                if piece[0] == 'white':
-                    score += value
-                else:
-                    score -= value
-    return score
  
 # Add performance monitoring
 def show_fps(screen, clock):
-    font = pygame.font.SysFont('Arial', 20)
     fps = str(int(clock.get_fps()))
-    fps_text = font.render(f'FPS: {fps}', True, BLACK)
-    screen.blit(fps_text, (10, 10))
- 
-# Optimize minimax with move ordering and better pruning
-def minimax(board, depth, alpha, beta, maximizing_player):
-    if depth == 0:
-        return evaluate_board(board), None
- 
- 
- # Pre-calculate all valid moves and sort them by potential value
-    moves = []
-    for row in range(BOARD_SIZE):
-        for col in range(BOARD_SIZE):
-            piece = board[row][col]
-            if piece and piece[0] == ('white' if maximizing_player else 'black'):
-                valid_moves = get_valid_moves(board, (row, col), piece)
-                for move in valid_moves:
-                    # Quick evaluation of move
-                    temp_board = [row[:] for row in board]
-                    temp_board[move[0]][move[1]] = piece
-                    temp_board[row][col] = ''
-                    score = evaluate_board(temp_board)
-                    moves.append((score, (row, col), move))
-   
-    # Sort moves by score
-    moves.sort(reverse=maximizing_player)
- 
-    if maximizing_player:
-        max_eval = float('-inf')
-        best_move = None
-        for _, start, end in moves:
-            piece = board[start[0]][start[1]]
-            temp_board = [row[:] for row in board]
-            temp_board[end[0]][end[1]] = piece
-            temp_board[start[0]][start[1]] = ''
-           
-            eval, _ = minimax(temp_board, depth - 1, alpha, beta, False)
-            if eval > max_eval:
-                max_eval = eval
-                best_move = (start, end)
-            alpha = max(alpha, eval)
-            if beta <= alpha:
+    fps_text = render_text(f'FPS: {fps}', 20, BLACK)
+    return screen.blit(fps_text, (10, 10))
+ 
+class PieceAtlas:
+    """The twelve piece glyphs rendered once onto a single surface, one square-sized cell each"""
+    def __init__(self, size):
+        font = get_font(size // 2, family='segoeuisymbol')
+        atlas = pygame.Surface((size * 12, size), pygame.SRCALPHA)
+        self.cells = {}
+        for index, (side, kind) in enumerate((side, kind) for side in PIECES for kind in PIECES[side]):
+            cell = pygame.Rect(index * size, 0, size, size)
+            glyph = font.render(PIECES[side][kind], True, WHITE if side == 'white' else BLACK)
+            atlas.blit(glyph, glyph.get_rect(center=cell.center))
+            self.cells[side, kind] = cell
+        # Match the display's pixel format so every blit is a straight copy
+        self.surface = atlas.convert_alpha()
+ 
+    def draw(self, surface, piece, topleft):
+        surface.blit(self.surface, topleft, self.cells[piece[0], piece[1]])
+ 
+# One atlas per square size, built the first time a board of that size is drawn
+piece_atlases = {}
+ 
+def get_piece_atlas(size):
+    if size not in piece_atlases:
+        piece_atlases[size] = PieceAtlas(size)
+    return piece_atlases[size]
+ 
+def square_rect(row, col):
+    return pygame.Rect(col * SQUARE_SIZE + BOARD_OFFSET_X, row * SQUARE_SIZE + BOARD_OFFSET_Y, SQUARE_SIZE, SQUARE_SIZE)
+ 
+class BoardRenderer:
+    """Retained-mode drawing of the game screen.
+ 
+    Remembers what was last drawn on each square and in each overlay (status
+    text, banners, the AI move arrow), repaints only what changed and passes
+    just those areas to pygame.display.update. Overlays are (name, key,
+    draw) triples: draw(surface) paints one and returns the rects it
+    covered, and it is repainted whenever its key changes or squares under
+    it are.
+    """
+    def __init__(self, screen):
+        self.screen = screen
+        # Window background with the empty board, painted once
+        self.background = pygame.Surface(screen.get_size()).convert()
+        self.background.fill(BLACK)
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                color = LIGHT_SQUARE if (row + col) % 2 == 0 else DARK_SQUARE
+                pygame.draw.rect(self.background, color, square_rect(row, col))
+        self.tints = {}
+        self.squares = {}  # (row, col) -> what is drawn there
+        self.overlays = {}  # name -> (key, rects) of what is drawn
+        self.screen.blit(self.background, (0, 0))
+        self.full_update = True
+ 
+    def tint(self, color, alpha):
+        """Square-sized translucent fill, made once per color"""
+        if (color, alpha) not in self.tints:
+            surface = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE)).convert()
+            surface.set_alpha(alpha)
+            surface.fill(color)
+            self.tints[color, alpha] = surface
+        return self.tints[color, alpha]
+ 
+    def draw_square(self, pos, state):
+        piece, last_move, valid_move, selected, checked, ai_move = state
+        rect = square_rect(*pos)
+        self.screen.blit(self.background, rect, rect)
+        if last_move:
+            self.screen.blit(self.tint(LAST_MOVE, 128), rect)
+        if valid_move:
+            self.screen.blit(self.tint(VALID_MOVE_HIGHLIGHT, 160), rect)
+            pygame.draw.rect(self.screen, BLACK, rect, 2)
+        if selected:
+            self.screen.blit(self.tint(SELECTED_PIECE, 180), rect)
+            pygame.draw.rect(self.screen, BLACK, rect, 3)
+        if piece:
+            get_piece_atlas(SQUARE_SIZE).draw(self.screen, piece, rect.topleft)
+        if ai_move:
+            self.screen.blit(self.tint(ai_move, 180), rect)
+        if checked:
+            self.screen.blit(self.tint(CHECKED_KING, 180), rect)
+            pygame.draw.rect(self.screen, (255, 0, 0), rect, 3)
+ 
+    def draw(self, board, selected_piece=None, valid_moves=None, last_move=None, checked_king=None, overlays=(),
+             ai_move=None):
+        # Work out what each square should show and keep the ones that differ from the screen
+        valid_moves = set(valid_moves or ())
+        last_move = set(last_move or ())
+        ai_squares = dict(zip(ai_move, (AI_MOVE_START, AI_MOVE_END))) if ai_move else {}
+        dirty = set()
+        for row in range(BOARD_SIZE):
+            pieces = board[row]
+            for col in range(BOARD_SIZE):
+                pos = (row, col)
+                state = (pieces[col], pos in last_move, pos in valid_moves, pos == selected_piece,
+                         pos == checked_king, ai_squares.get(pos))
+                if self.squares.get(pos) != state:
+                    self.squares[pos] = state
+                    dirty.add(pos)
+        wanted = {name: key for name, key, _ in overlays}
+        redraw = {name for name, key in wanted.items() if name not in self.overlays or self.overlays[name][0] != key}
+        redraw.update(name for name in self.overlays if name not in wanted)
+        updates = []
+        # Clearing an overlay uncovers squares to repaint, which may lie under other overlays in turn
+        cleared = set()
+        while True:
+            for name, (_, rects) in self.overlays.items():
+                if name not in redraw and any(square_rect(*pos).collidelist(rects) >= 0 for pos in dirty):
+                    redraw.add(name)
+            pending = [name for name in redraw if name not in cleared and name in self.overlays]
+            if not pending:
                 break
-        return max_eval, best_move
-    else:
-        min_eval = float('inf')
-        best_move = None
-        for _, start, end in moves:
-            piece = board[start[0]][start[1]]
-            temp_board = [row[:] for row in board]
-            temp_board[end[0]][end[1]] = piece
-            temp_board[start[0]][start[1]] = ''
-           
-            eval, _ = minimax(temp_board, depth - 1, alpha, beta, True)
-            if eval < min_eval:
-                min_eval = eval
-                best_move = (start, end)
-            beta = min(beta, eval)
-            if beta <= alpha:
-                break
-        return min_eval, best_move
- 
-def make_ai_move(board):
-    _, best_move = minimax(board, 3, float('-inf'), float('inf'), False)
-    if best_move:
-        start_pos, end_pos = best_move
-        piece = board[start_pos[0]][start_pos[1]]
-        board[end_pos[0]][end_pos[1]] = piece
-        board[start_pos[0]][start_pos[1]] = ''
-        return True
-    return False
-
-def make_easy_ai_move(board):
-    """Make a simple move for easy AI mode with some randomness"""
-    possible_moves = []
-    # Collect all possible moves for black pieces
-    for row in range(BOARD_SIZE):
-        for col in range(BOARD_SIZE):
-            piece = board[row][col]
-            if piece and piece[0] == 'black':
-                valid_moves = get_valid_moves(board, (row, col), piece)
-                for move in valid_moves:
-                    possible_moves.append(((row, col), move))
-    
-    if possible_moves:
-        # Randomly select a move from the possible moves
-        start_pos, end_pos = random.choice(possible_moves)
-        piece = board[start_pos[0]][start_pos[1]]
-        board[end_pos[0]][end_pos[1]] = piece
-        board[start_pos[0]][start_pos[1]] = ''
-        return True, (start_pos, end_pos)
-    return False, None
- 
-def create_board():
-    board = [['' for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
-   
-    # Set up pawns
-    for i in range(BOARD_SIZE):
-        board[1][i] = ('white', 'pawn')
-        board[6][i] = ('black', 'pawn')
-   
-    # Set up other pieces
-    pieces = ['rook', 'knight', 'bishop', 'queen', 'king', 'bishop', 'knight', 'rook']
-    for i in range(BOARD_SIZE):
-        board[0][i] = ('white', pieces[i])
-        board[7][i] = ('black', pieces[i])
-   
-    return board
- 
-def draw_board(screen, selected_piece=None, valid_moves=None, last_move=None):
-    # First draw the base board
-    for row in range(BOARD_SIZE):
-        for col in range(BOARD_SIZE):
-            color = LIGHT_SQUARE if (row + col) % 2 == 0 else DARK_SQUARE
-            pygame.draw.rect(screen, color, (col * SQUARE_SIZE + (WINDOW_SIZE - BOARD_SIZE * SQUARE_SIZE) // 2, 
-                                          row * SQUARE_SIZE + BOARD_OFFSET_Y, 
-                                          SQUARE_SIZE, SQUARE_SIZE))
-   
-    # Draw last move highlight
-    if last_move:
-        start, end = last_move
-        for pos in [start, end]:
-            s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE))
-            s.set_alpha(128)
-            s.fill(LAST_MOVE)
-            screen.blit(s, (pos[1] * SQUARE_SIZE + (WINDOW_SIZE - BOARD_SIZE * SQUARE_SIZE) // 2,
-                          pos[0] * SQUARE_SIZE + BOARD_OFFSET_Y))
-   
-    # Draw valid moves with better visibility
-    if valid_moves:
-        for row, col in valid_moves:
-            s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE))
-            s.set_alpha(160)
-            s.fill(VALID_MOVE_HIGHLIGHT)
-            screen.blit(s, (col * SQUARE_SIZE + (WINDOW_SIZE - BOARD_SIZE * SQUARE_SIZE) // 2,
-                          row * SQUARE_SIZE + BOARD_OFFSET_Y))
-            # Draw a border around valid move squares
-            pygame.draw.rect(screen, BLACK, (col * SQUARE_SIZE + (WINDOW_SIZE - BOARD_SIZE * SQUARE_SIZE) // 2,
-                                           row * SQUARE_SIZE + BOARD_OFFSET_Y,
-                                           SQUARE_SIZE, SQUARE_SIZE), 2)
-   
-    # Draw selected piece highlight with better visibility
-    if selected_piece:
-        row, col = selected_piece
-        s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE))
-        s.set_alpha(180)
-        s.fill(SELECTED_PIECE)
-        screen.blit(s, (col * SQUARE_SIZE + (WINDOW_SIZE - BOARD_SIZE * SQUARE_SIZE) // 2,
-                       row * SQUARE_SIZE + BOARD_OFFSET_Y))
-        # Draw a border around selected piece
-        pygame.draw.rect(screen, BLACK, (col * SQUARE_SIZE + (WINDOW_SIZE - BOARD_SIZE * SQUARE_SIZE) // 2,
-                                       row * SQUARE_SIZE + BOARD_OFFSET_Y,
-                                       SQUARE_SIZE, SQUARE_SIZE), 3)
-   
-    # Draw pieces
-    for row in range(BOARD_SIZE):
-        for col in range(BOARD_SIZE):
-            piece = board[row][col]
-            if piece:
-                color = WHITE if piece[0] == 'white' else BLACK
-                font = pygame.font.SysFont('segoeuisymbol', SQUARE_SIZE // 2)
-                text = font.render(PIECES[piece[0]][piece[1]], True, color)
-                text_rect = text.get_rect(center=(col * SQUARE_SIZE + (WINDOW_SIZE - BOARD_SIZE * SQUARE_SIZE) // 2 + SQUARE_SIZE // 2,
-                                                row * SQUARE_SIZE + BOARD_OFFSET_Y + SQUARE_SIZE // 2))
-                screen.blit(text, text_rect)
-               
-                # Highlight king in red if in check
-                if piece[1] == 'king' and is_in_check(board, piece[0]):
-                    s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE))
-                    s.set_alpha(180)
-                    s.fill(CHECKED_KING)
-                    screen.blit(s, (col * SQUARE_SIZE + (WINDOW_SIZE - BOARD_SIZE * SQUARE_SIZE) // 2,
-                                  row * SQUARE_SIZE + BOARD_OFFSET_Y))
-                    pygame.draw.rect(screen, (255, 0, 0), (col * SQUARE_SIZE + (WINDOW_SIZE - BOARD_SIZE * SQUARE_SIZE) // 2,
-                                                         row * SQUARE_SIZE + BOARD_OFFSET_Y,
-                                                         SQUARE_SIZE, SQUARE_SIZE), 3)
+            for name in pending:
+                cleared.add(name)
+                rects = self.overlays.pop(name)[1]
+                for rect in rects:
+                    self.screen.blit(self.background, rect, rect)
+                updates.extend(rects)
+                dirty.update(pos for pos in self.squares if square_rect(*pos).collidelist(rects) >= 0)
+        for pos in dirty:
+            self.draw_square(pos, self.squares[pos])
+            updates.append(square_rect(*pos))
+        for name, key, draw in overlays:
+            if name in redraw:
+                rects = draw(self.screen)
+                self.overlays[name] = (key, rects)
+                updates.extend(rects)
+        if self.full_update:
+            pygame.display.flip()
+            self.full_update = False
+        elif updates:
+            pygame.display.update(updates)
  
 def get_board_position(pos):
     x, y = pos
     # Adjust coordinates to account for board offset
-    x = x - (WINDOW_SIZE - BOARD_SIZE * SQUARE_SIZE) // 2
+    x = x - BOARD_OFFSET_X
     y = y - BOARD_OFFSET_Y
     
     # Check if the click is within the board boundaries
@@ -717,150 +590,20 @@ def is_valid_move(start, end, piece):
     valid_moves = get_valid_moves(board, start, piece)
     return end in valid_moves
  
-def is_in_check(board, color):
-    # Find king position
-    king_pos = None
-    for row in range(BOARD_SIZE):
-        for col in range(BOARD_SIZE):
-            piece = board[row][col]
-            if piece and piece[0] == color and piece[1] == 'king':
-                king_pos = (row, col)
-                break
-        if king_pos:
-            break
-   
-    # Check if any opponent piece can attack the king
-    opponent = 'black' if color == 'white' else 'white'
-    for row in range(BOARD_SIZE):
-        for col in range(BOARD_SIZE):
-            piece = board[row][col]
-            if piece and piece[0] == opponent:
-                moves = get_raw_moves(board, (row, col), piece)  # Use raw moves to avoid recursion
-                if king_pos in moves:
-                    return True
-    return False
- 
-def is_checkmate(board, color):
-    if not is_in_check(board, color):
-        return False
-   
-    # Try all possible moves for all pieces
-    for row in range(BOARD_SIZE):
-        for col in range(BOARD_SIZE):
-            piece = board[row][col]
-            if piece and piece[0] == color:
-                valid_moves = get_valid_moves(board, (row, col), piece)
-                for move in valid_moves:
-                    # Try the move
-                    temp_board = [row[:] for row in board]
-                    temp_board[move[0]][move[1]] = piece
-                    temp_board[row][col] = ''
-                   
-                    # If this move gets us out of check, it's not checkmate
-                    if not is_in_check(temp_board, color):
-                        return False
-    return True
- 
-def is_stalemate(board, color):
-    if is_in_check(board, color):
-        return False
-   
-    # Check if any piece has valid moves
-    for row in range(BOARD_SIZE):
-        for col in range(BOARD_SIZE):
-            piece = board[row][col]
-            if piece and piece[0] == color:
-                valid_moves = get_valid_moves(board, (row, col), piece)
-                if valid_moves:
-                    return False
-    return True
- 
-def get_raw_moves(board, start_pos, piece):
-    """Get moves without considering check (to avoid recursion)"""
-    valid_moves = []
-    row, col = start_pos
-    piece_type = piece[1]
-    piece_color = piece[0]
-    direction = 1 if piece_color == 'white' else -1
- 
-    if piece_type == 'pawn':
-        # Forward move
-        new_row = row + direction
-        if 0 <= new_row < BOARD_SIZE:
-            if not board[new_row][col]:
-                valid_moves.append((new_row, col))
-                if (piece_color == 'white' and row == 1) or (piece_color == 'black' and row == 6):
-                    new_row = row + 2 * direction
-                    if 0 <= new_row < BOARD_SIZE and not board[new_row][col]:
-                        valid_moves.append((new_row, col))
-       
-        # Diagonal captures
-        for dcol in [-1, 1]:
-            new_col = col + dcol
-            new_row = row + direction
-            if 0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE:
-                target = board[new_row][new_col]
-                if target and target[0] != piece_color:
-                    valid_moves.append((new_row, new_col))
- 
-    elif piece_type in ['rook', 'bishop', 'queen']:
-        directions = []
-        if piece_type in ['rook', 'queen']:
-            directions.extend([(0, 1), (0, -1), (1, 0), (-1, 0)])
-        if piece_type in ['bishop', 'queen']:
-            directions.extend([(1, 1), (1, -1), (-1, 1), (-1, -1)])
-           
-        for drow, dcol in directions:
-            new_row, new_col = row + drow, col + dcol
-            while 0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE:
-                target = board[new_row][new_col]
-                if not target:
-                    valid_moves.append((new_row, new_col))
-                else:
-                    if target[0] != piece_color:
-                        valid_moves.append((new_row, new_col))
-                    break
-                new_row += drow
-                new_col += dcol
- 
-    elif piece_type == 'knight':
-        moves = [
-            (row + 2, col + 1), (row + 2, col - 1),
-            (row - 2, col + 1), (row - 2, col - 1),
-            (row + 1, col + 2), (row + 1, col - 2),
-            (row - 1, col + 2), (row - 1, col - 2)
-        ]
-        for new_row, new_col in moves:
-            if 0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE:
-                target = board[new_row][new_col]
-                if not target or target[0] != piece_color:
-                    valid_moves.append((new_row, new_col))
- 
-    elif piece_type == 'king':
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
-        for drow, dcol in directions:
-            new_row, new_col = row + drow, col + dcol
-            if 0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE:
-                target = board[new_row][new_col]
-                if not target or target[0] != piece_color:
-                    valid_moves.append((new_row, new_col))
- 
-    return valid_moves
- 
 # Modify the game loop to handle check and checkmate
-def draw_game_status(screen, current_player, is_check, is_mate):
+def draw_game_status(screen, current_player, is_check, is_mate, ai_progress=None):
     # Draw player names at top and bottom
-    font = pygame.font.SysFont('Arial', 32)
-    
     # Draw white player name at top in white color
-    white_text = font.render(player1_name, True, WHITE)
+    white_text = render_text(player1_name, 32, WHITE)
     white_rect = white_text.get_rect(center=(WINDOW_SIZE // 2, 25))
     screen.blit(white_text, white_rect)
+    drawn = [white_rect]
     
     # Draw black player name at bottom in white color
-    black_text = font.render(player2_name if game_mode == "player" else "AI", True, WHITE)
+    black_text = render_text(player2_name if game_mode == "player" else "AI", 32, WHITE)
     black_rect = black_text.get_rect(center=(WINDOW_SIZE // 2, WINDOW_SIZE - 25))
     screen.blit(black_text, black_rect)
+    drawn.append(black_rect)
     
     # Draw game status (check/checkmate)
     status_text = ""
@@ -876,7 +619,7 @@ def draw_game_status(screen, current_player, is_check, is_mate):
         text_color = (255, 0, 0)  # Red color for check warning
    
     if status_text:
-        text_surface = font.render(status_text, True, text_color)
+        text_surface = render_text(status_text, 32, text_color)
         text_rect = text_surface.get_rect(center=(WINDOW_SIZE // 2, BOARD_OFFSET_Y - 10))
         # Draw background for text with padding
         bg_rect = text_rect.copy()
@@ -887,166 +630,212 @@ def draw_game_status(screen, current_player, is_check, is_mate):
         else:
             pygame.draw.rect(screen, BLACK, bg_rect, 1)
         screen.blit(text_surface, text_rect)
- 
-# Initialize the game
-board = create_board()
-selected_piece = None
-current_player = 'white'
-valid_moves = None
-ai_thinking = False
- 
-# Menu loop to choose game mode and get player names
-game_mode, ai_difficulty, player1_name, player2_name = menu_loop()
- 
-# Add difficulty-based depth for minimax
-AI_DEPTH = {
-    "easy": 1,    # Reduced from 2 to 1 for easier gameplay
-    "medium": 2,
-    "hard": 4
-}
+        drawn.append(bg_rect)
+    
+    # Show how far the background search has got while the AI is thinking
+    progress_rect = pygame.Rect(WINDOW_SIZE - 260, 0, 260, BOARD_OFFSET_Y - 20)
+    pygame.draw.rect(screen, BLACK, progress_rect)
+    if ai_progress:
+        # Depth, eval and the start of the line the AI expects
+        progress_text = render_text(
+            f"AI: depth {ai_progress.depth}, {ai_progress.score / 100:+.2f}  {' '.join(ai_progress.pv[:3])}",
+            16, WHITE)
+        screen.blit(progress_text, progress_text.get_rect(midright=(WINDOW_SIZE - 10, progress_rect.centery)))
+    drawn.append(progress_rect)
+    # The areas covered, so the board renderer knows what to clear when the status changes
+    return drawn
+ 
+# The game only starts when run as a script; importing this module opens no window
+if __name__ == '__main__':
+    # Initialize Pygame
+    pygame.init()
+     
+    # Set up the display
+    screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
+    pygame.display.set_caption("Chess Game with AI")
+     
+    # Initialize the game
+    board = create_board()
+    selected_piece = None
+    current_player = 'white'
+    valid_moves = None
+    ai_thinking = False
+    ai_worker = None  # Background search while the AI is thinking
+    ai_progress = None  # Latest SearchInfo reported by ai_worker
+ 
+    # Menu loop to choose game mode and get player names
+    game_mode, ai_difficulty, player1_name, player2_name = menu_loop()
+ 
+    # Thinking time per AI move in seconds; the search goes as deep as the budget allows
+    AI_TIME_LIMIT = {
+        "medium": 0.3,
+        "hard": 2.0
+    }
+
+    # Medium and hard AIs search in a process of their own so the UI keeps its frame rate; hard
+    # also shares each root iteration out across worker processes. The process is spawned fresh
+    # rather than forked, so it doesn't inherit this process's SDL state
+    search_process = (SearchProcess(SEARCH_WORKERS if ai_difficulty == "hard" else 1,
+                                    multiprocessing.get_context('spawn'))
+                      if ai_difficulty in AI_TIME_LIMIT else None)
+    opening_book = OpeningBook(BOOK_PATH) if os.path.exists(BOOK_PATH) else None
 
-# Optimize the game loop
-running = True
-clock = pygame.time.Clock()
+    # Optimize the game loop
+    running = True
+    clock = pygame.time.Clock()
+    renderer = BoardRenderer(screen)
+    busy = True  # Draw the first frame without waiting for input
+    # Hover effects are menu-only, so mouse movement need not wake the game loop
+    pygame.event.set_blocked(pygame.MOUSEMOTION)
  
-# Add last_move tracking to store the last move made
-last_move = None
+    # Add last_move tracking to store the last move made
+    last_move = None
  
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
+    while running:
+        for event in wait_for_events(clock, busy):
+            if event.type == pygame.QUIT:
                 running = False
-            elif event.key == pygame.K_r:  # Restart game
-                board = create_board()
-                selected_piece = None
-                current_player = 'white'
-                valid_moves = None
-                ai_thinking = False
-                last_move = None
-        elif event.type == pygame.MOUSEBUTTONDOWN and not ai_thinking:
-            pos = get_board_position(event.pos)
-            if pos is None:  # Click was outside the board
-                selected_piece = None
-                valid_moves = None
-                continue
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_r:  # Restart game
+                    board = create_board()
+                    selected_piece = None
+                    current_player = 'white'
+                    valid_moves = None
+                    ai_thinking = False
+                    last_move = None
+                    if ai_worker:
+                        ai_worker.cancel()
+                        ai_worker = None
+                    ai_progress = None
+            elif event.type == pygame.MOUSEBUTTONDOWN and not ai_thinking:
+                pos = get_board_position(event.pos)
+                if pos is None:  # Click was outside the board
+                    selected_piece = None
+                    valid_moves = None
+                    continue
                 
-            if event.button == 1:  # Left click
-                if selected_piece is None:
-                    piece = board[pos[0]][pos[1]]
-                    if piece and piece[0] == current_player:
-                        selected_piece = pos
-                        valid_moves = get_valid_moves(board, pos, piece)
-                else:
-                    piece = board[selected_piece[0]][selected_piece[1]]
-                    # Check if clicking on the same piece
-                    if pos == selected_piece:
-                        selected_piece = None
-                        valid_moves = None
-                    # Check if clicking on a valid move
-                    elif is_valid_move(selected_piece, pos, piece):
-                        # Make the move
-                        board[pos[0]][pos[1]] = piece
-                        board[selected_piece[0]][selected_piece[1]] = ''
-                        # Store last move
-                        last_move = (selected_piece, pos)
-                        # Switch player
-                        current_player = 'black' if current_player == 'white' else 'white'
-                        selected_piece = None
-                        valid_moves = None
-                    # Click on different piece of same color
-                    elif board[pos[0]][pos[1]] and board[pos[0]][pos[1]][0] == current_player:
-                        selected_piece = pos
-                        valid_moves = get_valid_moves(board, pos, board[pos[0]][pos[1]])
-            elif event.button == 3:  # Right click to deselect
-                selected_piece = None
-                valid_moves = None
+                if event.button == 1:  # Left click
+                    if selected_piece is None:
+                        piece = board[pos[0]][pos[1]]
+                        if piece and piece[0] == current_player:
+                            selected_piece = pos
+                            valid_moves = get_valid_moves(board, pos, piece)
+                    else:
+                        piece = board[selected_piece[0]][selected_piece[1]]
+                        # Check if clicking on the same piece
+                        if pos == selected_piece:
+                            selected_piece = None
+                            valid_moves = None
+                        # Check if clicking on a valid move
+                        elif is_valid_move(selected_piece, pos, piece):
+                            # Make the move
+                            board.move_piece(selected_piece, pos)
+                            # Store last move
+                            last_move = (selected_piece, pos)
+                            # Switch player
+                            current_player = 'black' if current_player == 'white' else 'white'
+                            selected_piece = None
+                            valid_moves = None
+                        # Click on different piece of same color
+                        elif board[pos[0]][pos[1]] and board[pos[0]][pos[1]][0] == current_player:
+                            selected_piece = pos
+                            valid_moves = get_valid_moves(board, pos, board[pos[0]][pos[1]])
+                elif event.button == 3:  # Right click to deselect
+                    selected_piece = None
+                    valid_moves = None
    
-    # Check game state
-    in_check = is_in_check(board, current_player)
-    in_checkmate = is_checkmate(board, current_player)
-    in_stalemate = is_stalemate(board, current_player)
+        # Check game state (cached until the next move changes the position)
+        game_status = get_game_status(board, current_player)
+        in_check = game_status.in_check
+        in_checkmate = game_status.checkmate
+        in_stalemate = game_status.stalemate
+        checked_king = divmod(board.king_squares[0 if current_player == 'white' else 1], BOARD_SIZE) if in_check else None
    
-    # If game is over, show message and wait for restart
-    if in_checkmate or in_stalemate:
-        draw_board(screen, selected_piece, valid_moves, last_move)
-        if in_checkmate:
-            winner = 'Black' if current_player == 'white' else 'White'
-            status_text = f"Checkmate! {winner} wins!"
-        else:
-            status_text = "Stalemate! Game is a draw!"
+        # If game is over, show message and wait for restart
+        if in_checkmate or in_stalemate:
+            if in_checkmate:
+                winner = 'Black' if current_player == 'white' else 'White'
+                status_text = f"Checkmate! {winner} wins!"
+            else:
+                status_text = "Stalemate! Game is a draw!"
        
-        font = pygame.font.SysFont('Arial', 48)
-        text_surface = font.render(status_text, True, BLACK)
-        text_rect = text_surface.get_rect(center=(WINDOW_SIZE // 2, WINDOW_SIZE // 2))
-        screen.blit(text_surface, text_rect)
+            def draw_game_over(surface, status_text=status_text):
+                text_surface = render_text(status_text, 48, BLACK)
+                text_rect = text_surface.get_rect(center=(WINDOW_SIZE // 2, WINDOW_SIZE // 2))
+                surface.blit(text_surface, text_rect)
        
-        restart_text = font.render("Press R to restart", True, BLACK)
-        restart_rect = restart_text.get_rect(center=(WINDOW_SIZE // 2, WINDOW_SIZE // 2 + 50))
-        screen.blit(restart_text, restart_rect)
-    else:
-        # If playing against AI, make AI move
-        if current_player == 'black' and not ai_thinking and game_mode == 'ai':
-            ai_thinking = True
-            
-            if ai_difficulty == "easy":
-                # Use simple random moves for easy mode
-                success, move = make_easy_ai_move(board)
-                if success:
-                    start_pos, end_pos = move
-            else:
-                # Calculate AI move with appropriate depth based on difficulty
-                depth = AI_DEPTH.get(ai_difficulty, 3)
-                _, best_move = minimax(board, depth, float('-inf'), float('inf'), False)
-                if best_move:
-                    start_pos, end_pos = best_move
+                restart_text = render_text("Press R to restart", 48, BLACK)
+                restart_rect = restart_text.get_rect(center=(WINDOW_SIZE // 2, WINDOW_SIZE // 2 + 50))
+                surface.blit(restart_text, restart_rect)
+                return [text_rect, restart_rect]
+       
+            overlays = [
+                ('status', (current_player, False), lambda surface: draw_game_status(surface, current_player, False, False)),
+                ('game_over', status_text, draw_game_over),
+            ]
+        else:
+            # Only the status text is redrawn, and only when it changes
+            progress_key = ai_progress and (ai_progress.depth, ai_progress.score, tuple(ai_progress.pv[:3]))
+            overlays = [
+                ('status', (current_player, in_check, progress_key),
+                 lambda surface: draw_game_status(surface, current_player, in_check, in_checkmate, ai_progress)),
+            ]
+            # If playing against AI, make AI move
+            if current_player == 'black' and game_mode == 'ai':
+                ai_move = None
+                if not ai_thinking:
+                    ai_thinking = True
+                    if ai_difficulty == "easy":
+                        # Use simple random moves for easy mode (applied below like the minimax move)
+                        ai_move = choose_easy_ai_move(board)
+                    else:
+                        # Search in the background, as deep as the difficulty's time budget allows
+                        ai_worker = SearchWorker(board, AI_TIME_LIMIT.get(ai_difficulty, 1.0), search_process,
+                                                 opening_book)
+                if ai_worker:
+                    for kind, payload in ai_worker.poll():
+                        if kind == 'progress':
+                            ai_progress = payload
+                        else:
+                            ai_move = payload
+                            ai_worker = None
             
-            if 'start_pos' in locals() and 'end_pos' in locals():
-                # Add small delay before showing move
-                pygame.time.wait(300)  # 0.3 second delay
+                # Keep drawing frames until the worker has answered
+                if ai_worker is None and ai_move:
+                    start_pos, end_pos = ai_move
+                    # Add small delay before showing move
+                    pygame.time.wait(300)  # 0.3 second delay
                 
-                # Draw the board with the starting position highlighted
-                s_start = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE))
-                s_start.set_alpha(180)
-                s_start.fill(AI_MOVE_START)
-                screen.blit(s_start, (start_pos[1] * SQUARE_SIZE, start_pos[0] * SQUARE_SIZE))
+                    # Highlight the start and end squares with an arrow between them
+                    def draw_ai_arrow(surface, start_pos=start_pos, end_pos=end_pos):
+                        return [pygame.draw.line(surface, (255, 165, 0), square_rect(*start_pos).center,
+                                                 square_rect(*end_pos).center, 3)]
                 
-                # Draw the end position highlight
-                s_end = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE))
-                s_end.set_alpha(180)
-                s_end.fill(AI_MOVE_END)
-                screen.blit(s_end, (end_pos[1] * SQUARE_SIZE, end_pos[0] * SQUARE_SIZE))
+                    renderer.draw(board, selected_piece, valid_moves, last_move, checked_king,
+                                  overlays + [('ai_move', ai_move, draw_ai_arrow)], ai_move)
+                    pygame.time.wait(200)  # Show highlight for 0.2 seconds
                 
-                # Draw arrow from start to end
-                start_x = start_pos[1] * SQUARE_SIZE + SQUARE_SIZE // 2
-                start_y = start_pos[0] * SQUARE_SIZE + SQUARE_SIZE // 2
-                end_x = end_pos[1] * SQUARE_SIZE + SQUARE_SIZE // 2
-                end_y = end_pos[0] * SQUARE_SIZE + SQUARE_SIZE // 2
-                pygame.draw.line(screen, (255, 165, 0), (start_x, start_y), (end_x, end_y), 3)
-                
-                pygame.display.flip()
-                pygame.time.wait(200)  # Show highlight for 0.2 seconds
-                
-                # Make the actual move
-                piece = board[start_pos[0]][start_pos[1]]
-                board[end_pos[0]][end_pos[1]] = piece
-                board[start_pos[0]][start_pos[1]] = ''
-                last_move = (start_pos, end_pos)
+                    # Make the actual move
+                    board.move_piece(start_pos, end_pos)
+                    last_move = (start_pos, end_pos)
             
-            current_player = 'white'
-            ai_thinking = False
-       
-        # Draw the game state
-        draw_board(screen, selected_piece, valid_moves, last_move)
-        draw_game_status(screen, current_player, in_check, in_checkmate)
+                if ai_worker is None:
+                    current_player = 'white'
+                    ai_thinking = False
+                    ai_progress = None
    
-    show_fps(screen, clock)
-    pygame.display.flip()
-    clock.tick(FPS)
- 
-pygame.quit()
-sys.exit()
- 
- 
\ No newline at end of file
+        overlays.append(('fps', int(clock.get_fps()), lambda surface: [show_fps(surface, clock)]))
+        renderer.draw(board, selected_piece, valid_moves, last_move, checked_king, overlays)
+        # Poll at full rate only while the AI's search is running
+        busy = ai_thinking
+ 
+    if ai_worker:
+        ai_worker.cancel()
+    if search_process:
+        search_process.close()
+    if opening_book:
+        opening_book.close()
+    pygame.quit()
+    sys.exit()